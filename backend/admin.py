@@ -1,13 +1,24 @@
-from fastapi import APIRouter, HTTPException, Header
-from database import db
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from database import db, read_db, pool_stats
 from bson import ObjectId
-from pydantic import BaseModel, EmailStr
-from typing import Optional
-from argon2 import PasswordHasher
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from pydantic import BaseModel, EmailStr, ValidationError
+from typing import Optional, List, Dict, Any
+from password_hashing import hash_password, stats as hashing_stats, HASH_WORKERS
+from indexes import index_status, check_query_plans
+import admin_stats
+import email_outbox
+import rate_limit
+from fast_json import FastJSONResponse, dumps as json_dumps
+from schemas import AdminUserPage
+import response_compression
+from outbreak_analytics import rebuild_rollups
 from datetime import datetime
+import asyncio
 
 router = APIRouter()
-ph = PasswordHasher()
 
 # Simple admin key auth — matches frontend ADMIN_SECRET_KEY
 ADMIN_KEY = "KRISHI_ADMIN_2025"
@@ -34,26 +45,108 @@ class AdminUserCreate(BaseModel):
     role: Optional[str] = "farmer"
 
 
+class BulkUserOp(BaseModel):
+    op: str                              # "create" | "update" | "delete"
+    id: Optional[str] = None             # update / delete
+    data: Optional[Dict[str, Any]] = None # create / update fields
+
+
+class BulkUserRequest(BaseModel):
+    operations: List[BulkUserOp]
+
+
 # ============ USER CRUD ============
 
-@router.get("/users")
-async def list_users(admin_key: str = Header(alias="X-Admin-Key")):
-    """List all users"""
-    verify_admin(admin_key)
+# Never pull password hashes for listings
+USER_PROJECTION = {"fullname": 1, "email": 1, "role": 1, "provider": 1, "created_at": 1}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+
+
+def serialize_user(user: dict) -> dict:
+    return {
+        "id": str(user["_id"]),
+        "fullname": user.get("fullname", ""),
+        "email": user.get("email", ""),
+        "role": user.get("role", "farmer"),
+        "provider": user.get("provider", "credentials"),
+        "created_at": user.get("created_at", "").isoformat() if isinstance(user.get("created_at"), datetime) else str(user.get("created_at", ""))
+    }
+
 
-    users = []
-    cursor = db.users.find({})
+def user_filter(role: Optional[str], provider: Optional[str],
+                created_from: Optional[datetime], created_to: Optional[datetime]) -> dict:
+    query = {}
+    if role:
+        query["role"] = role
+    if provider == "credentials":
+        # password users were stored without a provider field
+        query["provider"] = {"$in": [None, "credentials"]}
+    elif provider:
+        query["provider"] = provider
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    return query
+
+
+async def _export_users(query: dict):
+    cursor = read_db.users.find(query, USER_PROJECTION).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
     async for user in cursor:
-        users.append({
-            "id": str(user["_id"]),
-            "fullname": user.get("fullname", ""),
-            "email": user.get("email", ""),
-            "role": user.get("role", "farmer"),
-            "provider": user.get("provider", "credentials"),
-            "created_at": user.get("created_at", "").isoformat() if isinstance(user.get("created_at"), datetime) else str(user.get("created_at", ""))
-        })
+        yield json_dumps(serialize_user(user)) + b"\n"
+
+
+@router.get("/users", response_model=AdminUserPage)
+async def list_users(
+    admin_key: str = Header(alias="X-Admin-Key"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    role: Optional[str] = None,
+    provider: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    format: str = "json",
+):
+    """List users a page at a time (cursor on _id), or stream them all as NDJSON"""
+    verify_admin(admin_key)
+
+    query = user_filter(role, provider, created_from, created_to)
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(after)}
 
-    return {"users": users, "total": len(users)}
+    if format == "ndjson":
+        return StreamingResponse(_export_users(query), media_type="application/x-ndjson")
+
+    # one extra row tells us whether another page exists
+    cursor = db.users.find(query, USER_PROJECTION).sort("_id", 1).limit(limit + 1)
+    users = [serialize_user(user) async for user in cursor]
+    next_cursor = users[limit - 1]["id"] if len(users) > limit else None
+
+    return FastJSONResponse({"users": users[:limit], "next_cursor": next_cursor, "limit": limit})
+
+
+@router.get("/users/count")
+async def count_users(
+    admin_key: str = Header(alias="X-Admin-Key"),
+    role: Optional[str] = None,
+    provider: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Number of users matching the same filters as the listing"""
+    verify_admin(admin_key)
+
+    query = user_filter(role, provider, created_from, created_to)
+    if not query:
+        # collection metadata, no scan
+        return {"total": await db.users.estimated_document_count(), "estimated": True}
+    return {"total": await db.users.count_documents(query), "estimated": False}
 
 
 @router.get("/users/{user_id}")
@@ -64,18 +157,11 @@ async def get_user(user_id: str, admin_key: str = Header(alias="X-Admin-Key")):
     if not ObjectId.is_valid(user_id):
         raise HTTPException(status_code=400, detail="Invalid user ID")
 
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, USER_PROJECTION)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return {
-        "id": str(user["_id"]),
-        "fullname": user.get("fullname", ""),
-        "email": user.get("email", ""),
-        "role": user.get("role", "farmer"),
-        "provider": user.get("provider", "credentials"),
-        "created_at": user.get("created_at", "").isoformat() if isinstance(user.get("created_at"), datetime) else str(user.get("created_at", ""))
-    }
+    return serialize_user(user)
 
 
 @router.post("/users")
@@ -90,12 +176,16 @@ async def create_user(data: AdminUserCreate, admin_key: str = Header(alias="X-Ad
     new_user = {
         "fullname": data.fullname,
         "email": data.email,
-        "password": ph.hash(data.password),
+        "password": await hash_password(data.password),
         "role": data.role or "farmer",
         "created_at": datetime.utcnow()
     }
 
-    result = await db.users.insert_one(new_user)
+    try:
+        result = await db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already exists")
+    await admin_stats.bump("users")
 
     return {
         "message": "User created",
@@ -124,15 +214,18 @@ async def update_user(user_id: str, data: AdminUserUpdate, admin_key: str = Head
     if data.role is not None:
         update_fields["role"] = data.role
     if data.password is not None:
-        update_fields["password"] = ph.hash(data.password)
+        update_fields["password"] = await hash_password(data.password)
 
     if not update_fields:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    result = await db.users.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": update_fields}
-    )
+    try:
+        result = await db.users.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$set": update_fields}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already in use")
 
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
@@ -152,23 +245,210 @@ async def delete_user(user_id: str, admin_key: str = Header(alias="X-Admin-Key")
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    await admin_stats.bump("users", -1)
 
     return {"message": "User deleted"}
 
 
+# ============ BULK ============
+
+MAX_BULK_OPS = 1000
+
+
+def _first_error(e: ValidationError) -> str:
+    err = e.errors()[0]
+    return f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+
+
+@router.post("/users/bulk")
+async def bulk_users(req: BulkUserRequest, admin_key: str = Header(alias="X-Admin-Key")):
+    """Apply many create/update/delete operations in one bulk_write, with per-item results"""
+    verify_admin(admin_key)
+
+    if not req.operations:
+        raise HTTPException(status_code=400, detail="No operations given")
+    if len(req.operations) > MAX_BULK_OPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPS} operations per request")
+
+    results: List[Dict] = [{"index": i, "op": item.op} for i, item in enumerate(req.operations)]
+    prepared = []   # (result index, op, ObjectId, validated model)
+
+    for i, item in enumerate(req.operations):
+        try:
+            if item.op == "create":
+                prepared.append((i, "create", ObjectId(), AdminUserCreate(**(item.data or {}))))
+                continue
+            if item.op not in ("update", "delete"):
+                raise ValueError("op must be create, update or delete")
+            if not item.id or not ObjectId.is_valid(item.id):
+                raise ValueError("Invalid user ID")
+            model = AdminUserUpdate(**(item.data or {})) if item.op == "update" else None
+            if model is not None and not model.dict(exclude_none=True):
+                raise ValueError("No fields to update")
+            prepared.append((i, item.op, ObjectId(item.id), model))
+        except ValidationError as e:
+            results[i].update(status="error", error=_first_error(e))
+        except ValueError as e:
+            results[i].update(status="error", error=str(e))
+
+    # one round trip tells us which update/delete targets exist
+    target_ids = [oid for _, op, oid, _ in prepared if op != "create"]
+    existing = set()
+    if target_ids:
+        async for doc in db.users.find({"_id": {"$in": target_ids}}, {"_id": 1}):
+            existing.add(doc["_id"])
+
+    # like create_user, check emails up front instead of relying only on the
+    # unique index (which ensure_indexes tolerates failing to build)
+    create_emails = [model.email for _, op, _, model in prepared if op == "create"]
+    taken = set()
+    if create_emails:
+        async for doc in db.users.find({"email": {"$in": create_emails}}, {"email": 1}):
+            taken.add(doc["email"])
+
+    # drop failing items before paying for any hashing
+    live, seen_emails = [], set()
+    for entry in prepared:
+        i, op, oid, model = entry
+        if op != "create" and oid not in existing:
+            results[i].update(status="error", error="User not found")
+        elif op == "create" and (model.email in taken or model.email in seen_emails):
+            results[i].update(status="error", error="Email already exists")
+        else:
+            if op == "create":
+                seen_emails.add(model.email)
+            live.append(entry)
+
+    # hash passwords in parallel, but never more at once than the hashing pool has workers
+    gate = asyncio.Semaphore(HASH_WORKERS)
+
+    async def hashed(model):
+        # "" is a password too, hashed like the single-user endpoints do
+        if model is None or model.password is None:
+            return None
+        async with gate:
+            return await hash_password(model.password)
+
+    hashes = await asyncio.gather(*(hashed(model) for _, _, _, model in live))
+
+    requests, owners = [], []
+    for (i, op, oid, model), password_hash in zip(live, hashes):
+        if op == "create":
+            requests.append(InsertOne({
+                "_id": oid,
+                "fullname": model.fullname,
+                "email": model.email,
+                "password": password_hash,
+                "role": model.role or "farmer",
+                "created_at": datetime.utcnow()
+            }))
+        elif op == "update":
+            fields = model.dict(exclude_none=True)
+            # never write the plaintext, even when it is empty
+            fields.pop("password", None)
+            if password_hash is not None:
+                fields["password"] = password_hash
+            requests.append(UpdateOne({"_id": oid}, {"$set": fields}))
+        else:
+            requests.append(DeleteOne({"_id": oid}))
+        results[i].update(status="ok", id=str(oid))
+        owners.append(i)
+
+    if requests:
+        try:
+            await db.users.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                i = owners[err["index"]]
+                message = "Email already exists" if err.get("code") == 11000 else err.get("errmsg", "Write failed")
+                results[i].update(status="error", error=message)
+                results[i].pop("id", None)
+
+    ok = [r for r in results if r.get("status") == "ok"]
+    created = sum(1 for r in ok if r["op"] == "create")
+    deleted = sum(1 for r in ok if r["op"] == "delete")
+    if created != deleted:
+        await admin_stats.bump("users", created - deleted)
+
+    return {"results": results, "succeeded": len(ok), "failed": len(results) - len(ok)}
+
+
 # ============ STATS ============
 
 @router.get("/stats")
 async def get_stats(admin_key: str = Header(alias="X-Admin-Key")):
-    """Get dashboard stats"""
+    """Get dashboard stats (maintained counters, short-TTL cached)"""
     verify_admin(admin_key)
+    return await admin_stats.get_stats()
 
-    total_users = await db.users.count_documents({})
-    total_diagnoses = await db.diagnoses.count_documents({}) if "diagnoses" in await db.list_collection_names() else 0
-    total_soil = await db.soil_reports.count_documents({}) if "soil_reports" in await db.list_collection_names() else 0
 
-    return {
-        "total_users": total_users,
-        "total_diagnoses": total_diagnoses,
-        "total_soil_reports": total_soil
-    }
+@router.post("/stats/rebuild")
+async def rebuild_stats(admin_key: str = Header(alias="X-Admin-Key")):
+    """Recount the dashboard counters from the source collections"""
+    verify_admin(admin_key)
+    return await admin_stats.rebuild_counters()
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_disease_rollups(days: int = 30, admin_key: str = Header(alias="X-Admin-Key")):
+    """Backfill outbreak rollups for the last `days` from stored predictions"""
+    verify_admin(admin_key)
+    return await rebuild_rollups(max(1, min(days, 365)))
+
+
+
+@router.get("/hashing")
+async def get_hashing_stats(admin_key: str = Header(alias="X-Admin-Key")):
+    """Password hashing pool metrics"""
+    verify_admin(admin_key)
+    return hashing_stats()
+
+
+@router.get("/indexes")
+async def get_index_status(admin_key: str = Header(alias="X-Admin-Key")):
+    """Index build status and query-plan check for the hot queries"""
+    verify_admin(admin_key)
+    return {"indexes": index_status(), "query_plans": await check_query_plans()}
+
+
+@router.get("/db-pool")
+async def get_db_pool(admin_key: str = Header(alias="X-Admin-Key")):
+    """MongoDB connection pool utilisation"""
+    verify_admin(admin_key)
+    return pool_stats()
+
+
+@router.get("/outbox")
+async def get_outbox_stats(admin_key: str = Header(alias="X-Admin-Key")):
+    """Email outbox sender counters and backlog"""
+    verify_admin(admin_key)
+    backlog = await db.email_outbox.count_documents({"status": {"$in": ["pending", "sending"]}})
+    return {**email_outbox.stats(), "backlog": backlog}
+
+
+@router.get("/rate-limits")
+async def get_rate_limits(admin_key: str = Header(alias="X-Admin-Key")):
+    """Configured per-route limits and allowed/limited counters"""
+    verify_admin(admin_key)
+    return rate_limit.stats()
+
+
+@router.get("/ai-jobs")
+async def get_ai_jobs(admin_key: str = Header(alias="X-Admin-Key")):
+    """Prediction jobs per status, from db.ai_jobs.
+
+    Read from the database rather than a process's counters: the workers run
+    in the inference role, which may not be the process serving /admin.
+    """
+    verify_admin(admin_key)
+    by_status = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    async for row in db.ai_jobs.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        by_status[row["_id"]] = row["count"]
+    return {**by_status, "backlog": by_status["queued"] + by_status["running"]}
+
+
+@router.get("/compression")
+async def get_compression_stats(admin_key: str = Header(alias="X-Admin-Key")):
+    """Response compression settings and bytes saved"""
+    verify_admin(admin_key)
+    return response_compression.stats()
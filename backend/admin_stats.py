@@ -0,0 +1,128 @@
+# admin_stats.py  (incrementally maintained dashboard counters)
+import os, time, asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from database import db, read_db
+from outbreak_analytics import normalize_region
+
+STATS_CACHE_SECONDS = float(os.getenv("STATS_CACHE_SECONDS", "10"))
+BREAKDOWN_DAYS = int(os.getenv("STATS_BREAKDOWN_DAYS", "14"))
+
+COUNTERS_ID = "global"
+COUNTER_FIELDS = ("users", "diagnoses", "soil_reports")
+
+_cache: Dict = {"expires": 0.0, "value": None}
+# strong references to fire-and-forget counter updates (the loop keeps only weak ones)
+_pending = set()
+
+
+def _day(when: Optional[datetime] = None) -> str:
+    return (when or datetime.utcnow()).strftime("%Y-%m-%d")
+
+
+# ============ WRITES (called next to the inserts/deletes they count) ============
+
+def in_background(coro):
+    """Run a counter update without making the request wait on Mongo"""
+    task = asyncio.create_task(coro)
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def bump(field: str, amount: int = 1):
+    """Adjust one global counter; failures are logged, never raised to the caller"""
+    try:
+        await db.stats_counters.update_one({"_id": COUNTERS_ID}, {"$inc": {field: amount}}, upsert=True)
+    except Exception as e:
+        print(f"[WARN] Stats counter {field} not updated: {e}")
+
+
+async def _bump_daily(kind: str, key: str, when: Optional[datetime] = None):
+    day = _day(when)
+    try:
+        await db.stats_daily.update_one(
+            {"_id": f"{day}|{kind}|{key}"},
+            {"$set": {"day": day, "kind": kind, "key": key}, "$inc": {"count": 1}},
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"[WARN] Daily stats {kind}/{key} not updated: {e}")
+
+
+async def record_diagnosis():
+    # per-disease/day buckets live in disease_rollups (outbreak_analytics)
+    await bump("diagnoses")
+
+
+async def record_soil_report(region: Optional[str]):
+    await bump("soil_reports")
+    await _bump_daily("soil_report", normalize_region(region))
+
+
+# ============ READS ============
+
+async def rebuild_counters() -> Dict:
+    """Recount from the source collections (one-off backfill / drift repair)"""
+    counters = {
+        "users": await db.users.count_documents({}),
+        "diagnoses": await db.images.count_documents({"status": "analysed"}),
+        "soil_reports": (await db.stats_counters.find_one({"_id": COUNTERS_ID}) or {}).get("soil_reports", 0),
+    }
+    await db.stats_counters.update_one({"_id": COUNTERS_ID}, {"$set": counters}, upsert=True)
+    _cache["expires"] = 0.0
+    return counters
+
+
+async def ensure_counters():
+    """Backfill the counters document the first time the service runs"""
+    try:
+        if await db.stats_counters.find_one({"_id": COUNTERS_ID}) is None:
+            await rebuild_counters()
+    except Exception as e:
+        print(f"[WARN] Stats backfill skipped: {e}")
+
+
+async def _breakdowns() -> Dict:
+    since = _day(datetime.utcnow() - timedelta(days=BREAKDOWN_DAYS - 1))
+
+    per_day = []
+    pipeline = [
+        {"$match": {"day": {"$gte": since}}},
+        {"$group": {"_id": {"day": "$day", "disease": "$disease"}, "count": {"$sum": "$count"}}},
+        {"$sort": {"_id.day": 1, "count": -1}},
+    ]
+    async for row in read_db.disease_rollups.aggregate(pipeline):
+        per_day.append({"day": row["_id"]["day"], "disease": row["_id"]["disease"], "count": row["count"]})
+
+    regions: Dict[str, int] = {}
+    cursor = read_db.stats_daily.find({"kind": "soil_report", "day": {"$gte": since}}, {"_id": 0, "kind": 0})
+    async for doc in cursor:
+        regions[doc["key"]] = regions.get(doc["key"], 0) + doc["count"]
+
+    return {
+        "days": BREAKDOWN_DAYS,
+        "diagnoses_per_disease_per_day": per_day,
+        "soil_reports_per_region": [
+            {"region": region, "count": count}
+            for region, count in sorted(regions.items(), key=lambda x: -x[1])
+        ],
+    }
+
+
+async def get_stats() -> Dict:
+    """Dashboard stats from the counters document, cached for STATS_CACHE_SECONDS"""
+    now = time.monotonic()
+    if _cache["value"] is not None and now < _cache["expires"]:
+        return _cache["value"]
+
+    counters = await db.stats_counters.find_one({"_id": COUNTERS_ID}) or {}
+    value = {
+        "total_users": counters.get("users", 0),
+        "total_diagnoses": counters.get("diagnoses", 0),
+        "total_soil_reports": counters.get("soil_reports", 0),
+        "breakdowns": await _breakdowns(),
+        "generated_at": datetime.utcnow().isoformat(),
+    }
+    _cache["value"] = value
+    _cache["expires"] = now + STATS_CACHE_SECONDS
+    return value
@@ -0,0 +1,260 @@
+# ai_jobs.py  (submit/poll prediction jobs backed by db.ai_jobs)
+#
+# POST /api/ai/jobs stores the upload and returns a job id straight away;
+# worker tasks started from the app lifespan claim queued jobs with
+# find_one_and_update, so several processes can share the queue and a job
+# claimed by a process that died is picked up again once its lease expires.
+# Finished jobs keep their result until expires_at (TTL index).
+import os, time, random, asyncio, secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, Header, Query
+from fast_json import FastJSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from bson import Binary
+from database import db
+from session_tokens import optional_session
+from rate_limit import enforce as enforce_rate_limit
+from ai_predict import run_prediction, resolve_crop
+import inference_queue
+
+router = APIRouter(prefix="/api/ai", tags=["AI"])
+
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "2"))
+AI_JOB_POLL_SECONDS = float(os.getenv("AI_JOB_POLL_SECONDS", "2"))
+# a job stuck in "running" longer than this (worker crashed) is run again
+AI_JOB_LEASE_SECONDS = float(os.getenv("AI_JOB_LEASE_SECONDS", "300"))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+# how long finished results (and never-run jobs) are kept
+AI_JOB_RESULT_TTL_HOURS = int(os.getenv("AI_JOB_RESULT_TTL_HOURS", "24"))
+AI_JOB_MAX_WAIT_SECONDS = 30
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+JOB_PROJECTION = {"image": 0, "idem_key": 0}
+
+_wake: Optional[asyncio.Event] = None
+_tasks = []
+# job id -> event set when this process finishes the job (wakes long-polls early)
+_done_events: Dict[str, asyncio.Event] = {}
+_stats = {"submitted": 0, "deduplicated": 0, "completed": 0, "failed": 0, "released": 0}
+
+
+def serialize_job(doc: dict) -> dict:
+    job = {
+        "id": doc["_id"],
+        "status": doc["status"],
+        "created_at": doc["created_at"].isoformat(),
+        "attempts": doc.get("attempts", 0),
+    }
+    if doc.get("finished_at"):
+        job["finished_at"] = doc["finished_at"].isoformat()
+    if doc["status"] == "done":
+        job["result"] = doc.get("result")
+    if doc["status"] == "failed":
+        job["error"] = doc.get("error")
+    return job
+
+
+# ============ API ============
+
+@router.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    file: UploadFile = File(...),
+    region: Optional[str] = Form(None),
+    crop: Optional[str] = Form(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: dict = Depends(optional_session),
+):
+    """Queue a prediction and return its job id; resubmitting with the same Idempotency-Key returns the same job"""
+    user_id = session["sub"] if session else "anonymous"
+    if idempotency_key and not session:
+        # anonymous callers share no identity a key could be scoped to
+        raise HTTPException(status_code=401, detail="Idempotency-Key requires a session token",
+                            headers={"WWW-Authenticate": "Bearer"})
+    # keys are scoped per caller so two users can never collide
+    idem_key = f"{user_id}|{idempotency_key}" if idempotency_key else None
+
+    if idem_key:
+        existing = await db.ai_jobs.find_one({"idem_key": idem_key}, JOB_PROJECTION)
+        if existing:
+            _stats["deduplicated"] += 1
+            return FastJSONResponse(serialize_job(existing), status_code=200, headers={"Location": f"/api/ai/jobs/{existing['_id']}"})
+
+    await enforce_rate_limit("predict", request, user_id=session["sub"] if session else None)
+    # a bad hint is rejected now rather than failing later in the worker
+    crop = resolve_crop(crop)
+    contents = await file.read()
+    if len(contents) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+
+    now = datetime.utcnow()
+    job = {
+        "_id": secrets.token_urlsafe(16),
+        "userId": user_id,
+        "region": region,
+        "crop": crop,
+        "filename": file.filename,
+        "mimeType": file.content_type,
+        "image": Binary(contents),
+        "status": "queued",
+        "attempts": 0,
+        "created_at": now,
+        "next_attempt_at": now,
+        "expires_at": now + timedelta(hours=AI_JOB_RESULT_TTL_HOURS),
+    }
+    if idem_key:
+        job["idem_key"] = idem_key
+    try:
+        await db.ai_jobs.insert_one(job)
+    except DuplicateKeyError:
+        # a concurrent retry with the same key got there first
+        existing = await db.ai_jobs.find_one({"idem_key": idem_key}, JOB_PROJECTION)
+        _stats["deduplicated"] += 1
+        return FastJSONResponse(serialize_job(existing), status_code=200, headers={"Location": f"/api/ai/jobs/{existing['_id']}"})
+
+    _stats["submitted"] += 1
+    if _wake is not None:
+        _wake.set()
+    return FastJSONResponse(serialize_job(job), status_code=202, headers={"Location": f"/api/ai/jobs/{job['_id']}"})
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=AI_JOB_MAX_WAIT_SECONDS),
+                  session: dict = Depends(optional_session)):
+    """Job status and result; with wait=N, hold the request up to N seconds for the job to finish.
+
+    A signed-in user's jobs are only visible to that user (404 for anyone
+    else); anonymous jobs are reachable by their unguessable id alone.
+    """
+    caller = session["sub"] if session else "anonymous"
+    deadline = time.monotonic() + wait
+    try:
+        while True:
+            doc = await db.ai_jobs.find_one({"_id": job_id}, JOB_PROJECTION)
+            if not doc or doc.get("userId", "anonymous") not in ("anonymous", caller):
+                raise HTTPException(status_code=404, detail="Job not found or expired")
+            remaining = deadline - time.monotonic()
+            if doc["status"] in ("done", "failed") or remaining <= 0:
+                return serialize_job(doc)
+            # woken at once if this process finishes the job, otherwise re-checked
+            event = _done_events.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, AI_JOB_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # also runs when the client disconnects mid-poll (cancellation)
+        _done_events.pop(job_id, None)
+
+
+# ============ WORKERS ============
+
+async def _claim() -> Optional[dict]:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=AI_JOB_LEASE_SECONDS)
+    return await db.ai_jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "next_attempt_at": {"$lte": now}},
+            {"status": "running", "claimed_at": {"$lt": stale}},
+        ]},
+        {"$set": {"status": "running", "claimed_at": now}, "$inc": {"attempts": 1}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _finish(doc: dict, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+    now = datetime.utcnow()
+    update = {"status": status, "finished_at": now, "expires_at": now + timedelta(hours=AI_JOB_RESULT_TTL_HOURS)}
+    if result is not None:
+        update["result"] = result
+    if error is not None:
+        update["error"] = error
+    # the upload is no longer needed once the job has an outcome
+    await db.ai_jobs.update_one({"_id": doc["_id"]}, {"$set": update, "$unset": {"image": ""}})
+    _stats["completed" if status == "done" else "failed"] += 1
+    event = _done_events.pop(doc["_id"], None)
+    if event is not None:
+        event.set()
+
+
+async def _release(doc: dict, delay: float, refund_attempt: bool = True):
+    """Put a job back in the queue, by default without counting the attempt against it"""
+    update = {"$set": {"status": "queued", "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay)}}
+    if refund_attempt:
+        update["$inc"] = {"attempts": -1}
+    await db.ai_jobs.update_one({"_id": doc["_id"]}, update)
+    _stats["released"] += 1
+
+
+async def _run_job(doc: dict):
+    deadline = time.monotonic() + inference_queue.INFERENCE_MAX_BUDGET_MS / 1000
+    try:
+        result = await run_prediction(
+            bytes(doc["image"]), doc.get("filename"), doc.get("mimeType"), doc.get("region"), doc["userId"], deadline,
+            doc.get("crop"),
+        )
+    except HTTPException as e:
+        if e.status_code == 503:
+            # inference is shedding load; leave room for synchronous callers
+            retry_after = float((e.headers or {}).get("Retry-After", "1"))
+            await _release(doc, retry_after * random.uniform(1, 2))
+            return retry_after
+        await _finish(doc, "failed", error=e.detail)
+        return 0
+    except Exception as e:
+        if doc.get("attempts", 1) >= AI_JOB_MAX_ATTEMPTS:
+            await _finish(doc, "failed", error=f"{type(e).__name__}: {e}")
+        else:
+            print(f"[WARN] Job {doc['_id']} attempt {doc.get('attempts')} failed: {e}")
+            await _release(doc, AI_JOB_POLL_SECONDS, refund_attempt=False)
+        return 0
+    await _finish(doc, "done", result=result)
+    return 0
+
+
+async def _worker():
+    while True:
+        try:
+            doc = await _claim()
+            if doc is not None:
+                if doc.get("attempts", 1) > AI_JOB_MAX_ATTEMPTS:
+                    await _finish(doc, "failed", error="Too many attempts")
+                    continue
+                backoff = await _run_job(doc)
+                if backoff:
+                    await asyncio.sleep(backoff)
+                continue
+        except Exception as e:
+            print(f"[WARN] AI job worker error: {e}")
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=AI_JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+async def start():
+    """Start the job workers"""
+    global _wake
+    _wake = asyncio.Event()
+    for _ in range(max(1, AI_JOB_WORKERS)):
+        _tasks.append(asyncio.create_task(_worker()))
+
+
+async def stop():
+    # running jobs are left "running" and picked up again after their lease
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _tasks.clear()
+
+
+def stats() -> dict:
+    return {**_stats, "workers": len(_tasks)}
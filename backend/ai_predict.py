@@ -1,121 +1,374 @@
 # ai_predict.py  (lazy-loading, safe at import time)
-import os, io, json, threading, base64
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
-from fastapi.responses import JSONResponse
-from PIL import Image
-import torch
-import torchvision.transforms as T
+#
+# torch, torchvision and PIL are imported on first use (or by warmup()), so
+# processes that never serve predictions never pay for them.
+import os, io, json, threading, base64, asyncio
+from typing import Dict, List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, Query
+from fastapi.responses import Response
+from bson import ObjectId
+import hashlib
 from database import db
 from datetime import datetime
 from disease_remedies import DISEASE_REMEDIES
+from session_tokens import optional_session, require_session
+from admin_stats import record_diagnosis, in_background
+from outbreak_analytics import record_prediction, normalize_region
+from rate_limit import enforce as enforce_rate_limit
+import inference_queue
+from fast_json import FastJSONResponse
+from schemas import PredictResponse
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
 BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, "krishi_model_v2_ts.pt")
 CLASS_MAP_PATH = os.path.join(BASE_DIR, "class_to_idx.json")
+# optional per-crop models: <crop>_ts.pt + <crop>_classes.json (labels in output order)
+CROP_HEADS_DIR = os.getenv("CROP_HEADS_DIR", os.path.join(BASE_DIR, "crop_heads"))
+# "cpu", "cuda" or "auto" (cuda when available); prefork.py pins it to cpu
+MODEL_DEVICE = os.getenv("MODEL_DEVICE", "auto")
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # lazy objects
+torch = None
+Image = None
+_transform = None
 _model = None
 _idx_to_class = None
-_model_lock = threading.Lock()
+_model_lock = threading.RLock()
+# crop key -> class indices of the full model, and the same as a tensor on the model's device
+_crop_classes: Dict[str, List[int]] = {}
+_crop_index = {}
+# crop key -> (specialised TorchScript model, its labels)
+_crop_heads = {}
 
-_transform = T.Compose([
-    T.Resize((300,300)),
-    T.ToTensor(),
-    T.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
-])
+# images the full model is less sure than this about are rejected as non-leaf
+LEAF_CONFIDENCE_THRESHOLD = 0.85
+THUMBNAIL_SIZE = (160, 160)
+HISTORY_PAGE_SIZE = 20
+HISTORY_PROJECTION = {"disease": 1, "confidence": 1, "uploadedAt": 1, "thumbnail": 1, "region": 1}
 
-def _lazy_load():
-    global _model, _idx_to_class
-    if _model is not None and _idx_to_class is not None:
+
+def _make_thumbnail(img) -> Optional[str]:
+    """Small WebP data URI, generated once when the prediction is stored"""
+    try:
+        thumb = img.copy()
+        thumb.thumbnail(THUMBNAIL_SIZE)
+        buf = io.BytesIO()
+        thumb.save(buf, format="WEBP", quality=60, method=4)
+        return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+    except Exception as e:
+        print(f"[WARN] Thumbnail generation failed: {e}")
+        return None
+
+
+def _import_ml():
+    """Import the ML stack and build the preprocessing pipeline (once)"""
+    global torch, Image, _transform
+    if _transform is not None:
+        return
+    import torch as _torch
+    import torchvision.transforms as T
+    from PIL import Image as _Image
+    torch, Image = _torch, _Image
+    _transform = T.Compose([
+        T.Resize((300,300)),
+        T.ToTensor(),
+        T.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
+    ])
+
+
+def crop_key(name: str) -> str:
+    """Normalised crop name: Corn_(maize) -> corn, Pepper,_bell -> pepper"""
+    return name.split("_(")[0].split(",")[0].strip("_ ").lower()
+
+
+def _load_crop_heads(device):
+    heads = {}
+    if not os.path.isdir(CROP_HEADS_DIR):
+        return heads
+    for filename in sorted(os.listdir(CROP_HEADS_DIR)):
+        if not filename.endswith("_ts.pt"):
+            continue
+        crop = crop_key(filename[:-len("_ts.pt")])
+        labels_path = os.path.join(CROP_HEADS_DIR, filename[:-len("_ts.pt")] + "_classes.json")
+        try:
+            with open(labels_path, "r") as f:
+                labels = json.load(f)
+            head = torch.jit.load(os.path.join(CROP_HEADS_DIR, filename), map_location=device)
+            head.eval()
+        except Exception as e:
+            print(f"[WARN] Crop model {filename} not loaded: {e}")
+            continue
+        width = _output_width(head)
+        if not isinstance(labels, list) or width != len(labels):
+            print(f"[WARN] Crop model {filename} not loaded: it has {width} outputs "
+                  f"but {labels_path} lists {len(labels) if isinstance(labels, list) else 'no'} labels")
+            continue
+        heads[crop] = (head, labels)
+    return heads
+
+
+def _output_width(model) -> Optional[int]:
+    """Outputs of a classifier, read from its final layer's bias or weight rows.
+
+    Found without a forward pass, which prefork's master must not run.
+    """
+    params = list(model.parameters())
+    return int(params[-1].shape[0]) if params and params[-1].dim() > 0 else None
+
+
+def _load_class_map():
+    """Class labels and per-crop class indices (no torch needed)"""
+    global _idx_to_class
+    if _idx_to_class is not None:
         return
     with _model_lock:
-        if _model is not None and _idx_to_class is not None:
+        if _idx_to_class is not None:
             return
         if not os.path.exists(CLASS_MAP_PATH):
             raise FileNotFoundError(f"class map not found at {CLASS_MAP_PATH}")
         with open(CLASS_MAP_PATH, "r") as f:
             class_to_idx = json.load(f)
+        crop_classes = {}
+        for label, idx in class_to_idx.items():
+            crop_classes.setdefault(crop_key(label.split("___")[0]), []).append(int(idx))
+        _crop_classes.update({crop: sorted(indices) for crop, indices in crop_classes.items()})
         _idx_to_class = {str(v): k for k, v in class_to_idx.items()}
+
+
+def resolve_crop(crop: Optional[str]) -> Optional[str]:
+    """Normalised crop hint, or 400 when the model has no classes for it"""
+    if not crop:
+        return None
+    try:
+        _load_class_map()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    key = crop_key(crop)
+    if key not in _crop_classes:
+        raise HTTPException(status_code=400, detail=f"Unknown crop, expected one of: {', '.join(sorted(_crop_classes))}")
+    return key
+
+
+def _lazy_load():
+    global _model
+    if _model is not None:
+        return
+    with _model_lock:
+        if _model is not None:
+            return
+        _import_ml()
+        _load_class_map()
         if not os.path.exists(MODEL_PATH):
             raise FileNotFoundError(f"model file not found at {MODEL_PATH}")
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+        device = MODEL_DEVICE
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
         try:
-            _model = torch.jit.load(MODEL_PATH, map_location=device)
-            _model.eval()
+            model = torch.jit.load(MODEL_PATH, map_location=device)
+            model.eval()
         except Exception as e:
             raise RuntimeError(f"failed to load TorchScript model: {e}")
+        _crop_index.update({crop: torch.tensor(indices, device=device) for crop, indices in _crop_classes.items()})
+        _crop_heads.update(_load_crop_heads(device))
+        # published last: the fast path above only checks _model
+        _model = model
 
-@router.post("/predict")
-async def predict(request: Request, file: UploadFile = File(...)):
-    try:
-        _lazy_load()
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
-    contents = await file.read()
-    try:
-        img = Image.open(io.BytesIO(contents)).convert("RGB")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid image file")
+def warmup(forward: bool = True):
+    """Load the model ahead of the first request, optionally running one dummy batch"""
+    _lazy_load()
+    if forward:
+        _classify(Image.new("RGB", (300, 300)))
+
+
+def _classify(img, crop: Optional[str] = None):
+    """Top-3 predictions for a PIL image, plus the leaf confidence the
+    rejection gate uses; runs on an inference worker thread.
 
+    With a crop hint the softmax only covers that crop's classes, using the
+    crop's specialised model when one is installed. The gate always comes
+    from the full model's softmax (top class, or the hinted crop's share of
+    it), so narrowing the classes can't make a non-leaf image look confident.
+    Crops with a single class are not masked: that would always score 1.0.
+    """
     x = _transform(img).unsqueeze(0)
     device = next(_model.parameters()).device if hasattr(_model, "parameters") else "cpu"
     x = x.to(device)
+    if crop and len(_crop_classes[crop]) < 2:
+        crop = None
 
     with torch.no_grad():
-        logits = _model(x)
-        probs = torch.nn.functional.softmax(logits, dim=1)
-        top_p, top_idx = probs.topk(3, dim=1)
+        full = torch.nn.functional.softmax(_model(x), dim=1)
+        if crop in _crop_heads:
+            head, labels = _crop_heads[crop]
+            probs = torch.nn.functional.softmax(head(x), dim=1)
+        elif crop:
+            # same as a softmax over the crop's logits
+            masked = full.index_select(1, _crop_index[crop])
+            probs = masked / masked.sum(dim=1, keepdim=True)
+            labels = [_idx_to_class.get(str(idx), "unknown") for idx in _crop_classes[crop]]
+        else:
+            probs = full
+            labels = None
+        leaf_confidence = float(full[0].index_select(0, _crop_index[crop]).sum() if crop else full[0].max())
+        top_p, top_idx = probs.topk(min(3, probs.shape[1]), dim=1)
 
     results = []
     for p, idx in zip(top_p[0].cpu().tolist(), top_idx[0].cpu().tolist()):
-        label = _idx_to_class.get(str(int(idx)), "unknown")
+        label = labels[int(idx)] if labels is not None else _idx_to_class.get(str(int(idx)), "unknown")
         remedy = DISEASE_REMEDIES.get(label)
         results.append({
             "label": label,
             "prob": float(p),
             "remedy": remedy
         })
+    return results, leaf_confidence
 
-    low_confidence = results and results[0]["prob"] < 0.85
+
+async def run_prediction(contents: bytes, filename: Optional[str], content_type: Optional[str],
+                         region: Optional[str], user_id: str, deadline: float, crop: Optional[str] = None) -> dict:
+    """Classify one uploaded image and store it; shared by /predict and the job workers"""
+    try:
+        _lazy_load()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    crop = resolve_crop(crop)
+    # stored as the rollup key so rebuild_rollups groups the same way
+    region = normalize_region(region)
+
+    try:
+        img = Image.open(io.BytesIO(contents)).convert("RGB")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid image file")
+
+    results, leaf_confidence = await inference_queue.submit(_classify, img, crop, deadline=deadline)
+
+    low_confidence = bool(results) and leaf_confidence < LEAF_CONFIDENCE_THRESHOLD
 
     # Reject non-leaf images
     if low_confidence:
-        return JSONResponse({
+        return {
             "predictions": results,
             "low_confidence": True,
             "rejected": True,
             "message": "This does not appear to be a valid plant leaf image. Please upload a clear photo of a diseased leaf."
-        })
+        }
 
     # --- Save image + prediction to MongoDB as Base64 ---
     try:
         image_b64 = base64.b64encode(contents).decode("utf-8")
-        mime_type = file.content_type or "image/jpeg"
+        mime_type = content_type or "image/jpeg"
         image_data_uri = f"data:{mime_type};base64,{image_b64}"
 
-        user_id = request.headers.get("X-User-Id", "anonymous")
         top_prediction = results[0] if results else {}
 
+        # WebP encoding is CPU work; keep it off the event loop
+        thumbnail = await asyncio.to_thread(_make_thumbnail, img)
+        uploaded_at = datetime.utcnow()
+        disease = top_prediction.get("label", "unknown")
+        confidence = round(top_prediction.get("prob", 0.0) * 100, 2)
         await db.images.insert_one({
             "userId": user_id,
-            "filename": file.filename,
+            "filename": filename,
             "imageData": image_data_uri,
             "mimeType": mime_type,
-            "disease": top_prediction.get("label", "unknown"),
-            "confidence": round(top_prediction.get("prob", 0.0) * 100, 2),
+            "disease": disease,
+            "confidence": confidence,
+            "region": region,
+            "crop": crop,
+            "thumbnail": thumbnail,
             "allPredictions": [{"label": r["label"], "prob": r["prob"]} for r in results],
             "lowConfidence": bool(low_confidence),
-            "uploadedAt": datetime.utcnow(),
+            "uploadedAt": uploaded_at,
             "status": "analysed"
         })
+        in_background(record_diagnosis())
+        in_background(record_prediction(disease, region, confidence, uploaded_at))
     except Exception as db_err:
         print(f"[WARN] Failed to save image to MongoDB: {db_err}")
 
-    return JSONResponse({"predictions": results, "low_confidence": False})
\ No newline at end of file
+    return {"predictions": results, "low_confidence": False}
+
+
+@router.post("/predict", response_model=PredictResponse)
+async def predict(request: Request, file: UploadFile = File(...), region: Optional[str] = Form(None),
+                  crop: Optional[str] = Form(None), session: dict = Depends(optional_session)):
+    user_id = session["sub"] if session else "anonymous"
+    await enforce_rate_limit("predict", request, user_id=session["sub"] if session else None)
+    deadline = inference_queue.deadline_from(request)
+    contents = await file.read()
+    result = await run_prediction(contents, file.filename, file.content_type, region, user_id, deadline, crop)
+    return FastJSONResponse(result)
+
+
+def _encode_cursor(doc: dict) -> str:
+    raw = f"{doc['uploadedAt'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode("ascii")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        uploaded_at, _, doc_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(uploaded_at), ObjectId(doc_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/history")
+async def history(
+    request: Request,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=100),
+    before: Optional[str] = None,
+    session: dict = Depends(require_session),
+):
+    """The caller's past diagnoses, newest first, without the image payload"""
+    query = {"userId": session["sub"]}
+    if before:
+        uploaded_at, doc_id = _decode_cursor(before)
+        # keyset on (uploadedAt, _id) so equal timestamps never repeat or skip
+        query["$or"] = [
+            {"uploadedAt": {"$lt": uploaded_at}},
+            {"uploadedAt": uploaded_at, "_id": {"$lt": doc_id}},
+        ]
+
+    cursor = db.images.find(query, HISTORY_PROJECTION).sort([("uploadedAt", -1), ("_id", -1)]).limit(limit + 1)
+    docs = [doc async for doc in cursor]
+    next_cursor = _encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+
+    items = []
+    for doc in docs[:limit]:
+        label = doc.get("disease", "unknown")
+        items.append({
+            "id": str(doc["_id"]),
+            "disease": label,
+            "name": DISEASE_REMEDIES.get(label, {}).get("name", label),
+            "confidence": doc.get("confidence", 0.0),
+            "region": doc.get("region"),
+            "uploadedAt": doc["uploadedAt"].isoformat(),
+            "thumbnail": doc.get("thumbnail"),
+        })
+
+    # pages behind a cursor only change on deletes; the first page changes on every scan
+    etag = '"' + hashlib.sha1(f"{session['sub']}|{before}|{limit}|{[i['id'] for i in items]}".encode()).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=3600" if before else "private, max-age=0, must-revalidate",
+        "Vary": "Authorization",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor}, headers=headers)
+
+
+@router.get("/queue")
+async def queue_stats():
+    """Inference queue depth, service time estimate and served/shed counters"""
+    return inference_queue.stats()
@@ -1,21 +1,31 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header, Request
 from database import db
 from schemas import RegisterSchema, LoginSchema
-from argon2 import PasswordHasher
+from password_hashing import hash_password, verify_password, needs_rehash
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from schemas import OAuthLoginSchema
 from datetime import datetime
+from typing import Optional
+from session_tokens import issue_token, require_session, revoke
+from admin_stats import bump as bump_stat
+from rate_limit import enforce as enforce_rate_limit
+import hmac, os
 
 router = APIRouter()
-ph = PasswordHasher()
+
+# Shared with the NextAuth server; /oauth-login only trusts callers that send it
+# and refuses to issue sessions at all while it is unset
+OAUTH_SYNC_SECRET = os.getenv("OAUTH_SYNC_SECRET")
 
 @router.post("/register")
-async def register(user: RegisterSchema):
+async def register(user: RegisterSchema, request: Request):
+    await enforce_rate_limit("register", request)
     existing = await db.users.find_one({"email": user.email})
     if existing:
         raise HTTPException(status_code=400, detail="Email already exists")
 
-    hashed_pass = ph.hash(user.password)
+    hashed_pass = await hash_password(user.password)
 
     new_user = {
         "fullname": user.fullname,
@@ -24,7 +34,12 @@ async def register(user: RegisterSchema):
         "role": user.role or "farmer"     #  FIXED ROLE
     }
 
-    result = await db.users.insert_one(new_user)
+    try:
+        result = await db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        # lost the race against a concurrent register with the same email
+        raise HTTPException(status_code=400, detail="Email already exists")
+    await bump_stat("users")
 
     return {
         "message": "User registered successfully",
@@ -33,25 +48,43 @@ async def register(user: RegisterSchema):
     }
 
 
+async def upgrade_password_hash(user_id: ObjectId, old_hash: str, password: str):
+    """Re-hash with the current argon2 parameters after a successful login"""
+    try:
+        new_hash = await hash_password(password)
+        # only replace the hash we verified, in case the password changed meanwhile
+        await db.users.update_one({"_id": user_id, "password": old_hash}, {"$set": {"password": new_hash}})
+    except Exception as e:
+        print(f"[WARN] Password rehash failed for {user_id}: {e}")
+
+
 @router.post("/login")
-async def login(credentials: LoginSchema):
+async def login(credentials: LoginSchema, background_tasks: BackgroundTasks, request: Request):
+    await enforce_rate_limit("login", request, email=credentials.email)
     user = await db.users.find_one({"email": credentials.email})
     if not user:
         raise HTTPException(status_code=400, detail="Invalid email")
 
-    try:
-        ph.verify(user["password"], credentials.password)
-    except:
+    if not await verify_password(user.get("password"), credentials.password):
         raise HTTPException(status_code=400, detail="Invalid password")
 
+    if needs_rehash(user["password"]):
+        background_tasks.add_task(upgrade_password_hash, user["_id"], user["password"], credentials.password)
+
     return {
         "message": "Login successful",
         "userId": str(user["_id"]),
         "fullname": user["fullname"],
-        "role": user["role"]              #  now visible
+        "role": user["role"],             #  now visible
+        "token": issue_token(str(user["_id"]), user["role"])
     }
 @router.post("/oauth-login")
-async def oauth_login(user: OAuthLoginSchema):
+async def oauth_login(user: OAuthLoginSchema, sync_secret: Optional[str] = Header(None, alias="X-OAuth-Sync-Secret")):
+    if not OAUTH_SYNC_SECRET:
+        raise HTTPException(status_code=503, detail="OAuth login is not configured")
+    if not hmac.compare_digest(sync_secret or "", OAUTH_SYNC_SECRET):
+        raise HTTPException(status_code=403, detail="Invalid OAuth sync secret")
+
     existing = await db.users.find_one({"email": user.email})
 
     # If Google user logs in first time → create account
@@ -65,19 +98,34 @@ async def oauth_login(user: OAuthLoginSchema):
             "created_at": datetime.utcnow()
         }
 
-        result = await db.users.insert_one(new_user)
-
-        return {
-            "message": "OAuth user created",
-            "userId": str(result.inserted_id),
-            "fullname": new_user["fullname"],
-            "role": new_user["role"]
-        }
+        try:
+            result = await db.users.insert_one(new_user)
+        except DuplicateKeyError:
+            # a parallel first login created the account; fall through to it
+            existing = await db.users.find_one({"email": user.email})
+        else:
+            await bump_stat("users")
+            return {
+                "message": "OAuth user created",
+                "userId": str(result.inserted_id),
+                "fullname": new_user["fullname"],
+                "role": new_user["role"],
+                "token": issue_token(str(result.inserted_id), new_user["role"])
+            }
 
     # If user already exists
     return {
         "message": "OAuth login successful",
         "userId": str(existing["_id"]),
         "fullname": existing["fullname"],
-        "role": existing["role"]
-    }
\ No newline at end of file
+        "role": existing["role"],
+        "token": issue_token(str(existing["_id"]), existing["role"])
+    }
+
+
+@router.post("/logout")
+async def logout(session: dict = Depends(require_session)):
+    """Revoke the caller's session token"""
+    await revoke(session)
+    return {"message": "Logged out"}
+
@@ -1,10 +1,150 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, monitoring
 from dotenv import load_dotenv
-import os
+import os, time, threading
 
 load_dotenv()
 
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URL)
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "krishi_ai_db")
 
-db = client["krishi_ai_db"]
+# Pool and timeout tuning (all overridable from .env)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+# zstd/snappy need the zstandard/python-snappy packages; pymongo skips missing ones
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+# read preference for read_db, i.e. the lag-tolerant analytics reads (rollups,
+# exports, sensor windows). Anything that must see the caller's own writes
+# reads through db. Set e.g. "secondaryPreferred" to offload these reads.
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+_READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool utilisation counters fed by pymongo's CMAP events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {
+            "created": 0,
+            "closed": 0,
+            "checked_out": 0,
+            "max_checked_out": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "checkout_wait_seconds": 0.0,
+            "max_checkout_wait_seconds": 0.0,
+            "pool_clears": 0,
+        }
+
+    def _inc(self, key, amount=1):
+        with self._lock:
+            self.counters[key] += amount
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def pool_cleared(self, event):
+        self._inc("pool_clears")
+
+    def connection_created(self, event):
+        self._inc("created")
+
+    def connection_closed(self, event):
+        self._inc("closed")
+
+    def connection_check_out_started(self, event):
+        # motor runs each operation on one executor thread, so a thread-local
+        # start time pairs this event with the matching checked-out event
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._inc("checkout_failures")
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        with self._lock:
+            c = self.counters
+            c["checkouts"] += 1
+            c["checked_out"] += 1
+            c["max_checked_out"] = max(c["max_checked_out"], c["checked_out"])
+            c["checkout_wait_seconds"] += waited
+            c["max_checkout_wait_seconds"] = max(c["max_checkout_wait_seconds"], waited)
+
+    def connection_checked_in(self, event):
+        self._inc("checked_out", -1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            c = dict(self.counters)
+        return {
+            **c,
+            "open": c["created"] - c["closed"],
+            "utilisation": round(c["checked_out"] / MONGO_MAX_POOL_SIZE, 3),
+            "avg_checkout_wait_ms": round(c["checkout_wait_seconds"] / (c["checkouts"] or 1) * 1000, 3),
+        }
+
+
+def create_client(max_pool_size: int = MONGO_MAX_POOL_SIZE, listener: PoolMetrics = None) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=max_pool_size,
+        minPoolSize=min(MONGO_MIN_POOL_SIZE, max_pool_size),
+        maxIdleTimeMS=MONGO_MAX_IDLE_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        compressors=MONGO_COMPRESSORS,
+        event_listeners=[listener] if listener else [],
+    )
+
+
+# The client only opens sockets on first use, so creating it at import is cheap;
+# connect()/close() are driven by the FastAPI lifespan in main.py.
+pool_metrics = PoolMetrics()
+client = create_client(listener=pool_metrics)
+
+db = client[MONGO_DB_NAME]
+# same database; reads may go to secondaries when MONGO_READ_PREFERENCE allows
+read_db = client.get_database(
+    MONGO_DB_NAME,
+    read_preference=_READ_PREFERENCES.get(MONGO_READ_PREFERENCE, ReadPreference.PRIMARY),
+)
+
+
+async def connect():
+    """Verify the server is reachable (warms minPoolSize connections)"""
+    try:
+        await client.admin.command("ping")
+        print(f"[DB] Connected to {MONGO_DB_NAME} (pool {MONGO_MIN_POOL_SIZE}-{MONGO_MAX_POOL_SIZE})")
+    except Exception as e:
+        print(f"[WARN] MongoDB not reachable at startup: {e}")
+
+
+def close():
+    client.close()
+
+
+def pool_stats() -> dict:
+    return {
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "read_preference": MONGO_READ_PREFERENCE,
+        **pool_metrics.snapshot(),
+    }
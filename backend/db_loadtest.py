@@ -0,0 +1,78 @@
+"""
+Pool-sizing load test against a local mongod.
+
+    python db_loadtest.py --pool-sizes 5,20,100 --concurrency 200 --ops 20000
+
+For each pool size a fresh client runs the same mix of indexed point reads
+and small writes, then reports throughput, p50/p99 latency and how long
+operations waited for a pooled connection.
+"""
+import argparse, asyncio, random, time
+from database import MONGO_DB_NAME, PoolMetrics, create_client
+
+COLLECTION = "loadtest_users"
+
+
+async def seed(db, docs: int):
+    await db[COLLECTION].drop()
+    await db[COLLECTION].insert_many(
+        [{"email": f"user{i}@example.com", "fullname": f"User {i}", "role": "farmer"} for i in range(docs)]
+    )
+    await db[COLLECTION].create_index("email", unique=True)
+
+
+async def run(pool_size: int, concurrency: int, ops: int, docs: int, write_ratio: float):
+    metrics = PoolMetrics()
+    client = create_client(max_pool_size=pool_size, listener=metrics)
+    db = client[MONGO_DB_NAME]
+    latencies = []
+    remaining = ops
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            email = f"user{random.randrange(docs)}@example.com"
+            started = time.perf_counter()
+            if random.random() < write_ratio:
+                await db[COLLECTION].update_one({"email": email}, {"$set": {"seen": started}})
+            else:
+                await db[COLLECTION].find_one({"email": email}, {"fullname": 1})
+            latencies.append(time.perf_counter() - started)
+
+    await db.command("ping")
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    latencies.sort()
+    stats = metrics.snapshot()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"pool={pool_size:>4}  {ops / elapsed:8.0f} ops/s  p50={p50:6.2f}ms  p99={p99:7.2f}ms  "
+          f"conns={stats['created']:>4}  avg_wait={stats['avg_checkout_wait_ms']:.2f}ms  "
+          f"max_wait={stats['max_checkout_wait_seconds'] * 1000:.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MongoDB pool sizing load test")
+    parser.add_argument("--pool-sizes", default="5,20,50,100")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    seed_client = create_client()
+    await seed(seed_client[MONGO_DB_NAME], args.docs)
+
+    for size in (int(s) for s in args.pool_sizes.split(",")):
+        await run(size, args.concurrency, args.ops, args.docs, args.write_ratio)
+
+    await seed_client[MONGO_DB_NAME][COLLECTION].drop()
+    seed_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,242 @@
+# email_outbox.py  (persistent email outbox + pooled SMTP sender)
+#
+# Requests only insert into db.email_outbox; a background sender started from
+# the app lifespan drains it in batches over persistent SMTP connections.
+# For local testing run a debugging server and point the sender at it:
+#   python -m aiosmtpd -n -l localhost:1025
+#   SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_USE_TLS=false
+import os, time, random, asyncio, smtplib, threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ReturnDocument
+from dotenv import load_dotenv
+from database import db
+from email_templates import render_otp, DEFAULT_LANGUAGE, OTP_TEMPLATES
+
+load_dotenv()
+
+# Email configuration
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "15"))
+SENDER_EMAIL = os.getenv("SENDER_EMAIL")  # Your email
+SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")  # App password for Gmail
+
+# Sender tuning
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "5"))
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "600"))
+# a message stuck in "sending" longer than this (crash mid-send) is retried
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+# sent/failed messages are purged by a TTL index after this long
+OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", "24"))
+# idle connections are probed with NOOP before reuse
+SMTP_IDLE_CHECK_SECONDS = 60
+
+_wake: Optional[asyncio.Event] = None
+_task: Optional[asyncio.Task] = None
+_stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "reconnects": 0}
+
+
+# ============ MESSAGES ============
+
+def render(doc: dict) -> str:
+    if doc["kind"] == "otp":
+        return render_otp(doc["to"], doc["otp"], doc.get("lang") or DEFAULT_LANGUAGE)
+    raise ValueError(f"unknown email kind {doc['kind']}")
+
+
+# ============ SMTP POOL ============
+
+class SmtpConnection:
+    """One persistent SMTP session, reconnected on demand; used by one thread at a time"""
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        self.close()
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_USE_TLS:
+            server.starttls()
+        if SENDER_PASSWORD:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        self._server = server
+        _stats["reconnects"] += 1
+
+    def _ensure(self):
+        if self._server is None:
+            self._connect()
+        elif time.monotonic() - self._last_used > SMTP_IDLE_CHECK_SECONDS:
+            try:
+                if self._server.noop()[0] != 250:
+                    self._connect()
+            except smtplib.SMTPException:
+                self._connect()
+
+    def send(self, recipient: str, raw: str):
+        """Send one message, reconnecting once if the session dropped"""
+        with self.lock:
+            self._ensure()
+            try:
+                self._server.sendmail(SENDER_EMAIL, recipient, raw)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError):
+                self._connect()
+                self._server.sendmail(SENDER_EMAIL, recipient, raw)
+            self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+
+_pool = [SmtpConnection() for _ in range(max(1, SMTP_POOL_SIZE))]
+
+
+def _send_chunk(conn: SmtpConnection, docs: List[dict]) -> List[Optional[str]]:
+    """Runs in a worker thread; returns an error string (or None) per message"""
+    errors = []
+    for doc in docs:
+        try:
+            conn.send(doc["to"], render(doc))
+            errors.append(None)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+    return errors
+
+
+# ============ OUTBOX ============
+
+async def enqueue_otp_email(recipient_email: str, otp: str, lang: str = DEFAULT_LANGUAGE):
+    """Queue an OTP email; returns as soon as it is persisted"""
+    now = datetime.utcnow()
+    await db.email_outbox.insert_one({
+        "kind": "otp",
+        "to": recipient_email,
+        "otp": otp,
+        "lang": lang if lang in OTP_TEMPLATES else DEFAULT_LANGUAGE,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+    })
+    _stats["queued"] += 1
+    if _wake is not None:
+        _wake.set()
+
+
+async def _claim_batch() -> List[dict]:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=OUTBOX_LEASE_SECONDS)
+    batch = []
+    for _ in range(OUTBOX_BATCH_SIZE):
+        doc = await db.email_outbox.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                # claimed by a sender that died mid-send
+                {"status": "sending", "claimed_at": {"$lt": stale}},
+            ]},
+            {"$set": {"status": "sending", "claimed_at": now}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            break
+        batch.append(doc)
+    return batch
+
+
+async def _finish(doc: dict, error: Optional[str]):
+    now = datetime.utcnow()
+    purge_at = now + timedelta(hours=OUTBOX_RETENTION_HOURS)
+    if error is None:
+        _stats["sent"] += 1
+        await db.email_outbox.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"status": "sent", "sent_at": now, "purge_at": purge_at}, "$unset": {"otp": ""}},
+        )
+        return
+
+    attempts = doc.get("attempts", 0) + 1
+    print(f"[OTP EMAIL ERROR] attempt {attempts} to {doc['to']}: {error}")
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        _stats["failed"] += 1
+        await db.email_outbox.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"status": "failed", "attempts": attempts, "last_error": error, "purge_at": purge_at},
+             "$unset": {"otp": ""}},
+        )
+        return
+
+    _stats["retried"] += 1
+    delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), OUTBOX_MAX_BACKOFF_SECONDS)
+    delay *= random.uniform(0.8, 1.2)
+    await db.email_outbox.update_one(
+        {"_id": doc["_id"]},
+        {"$set": {"status": "pending", "attempts": attempts, "last_error": error,
+                  "next_attempt_at": now + timedelta(seconds=delay)}},
+    )
+
+
+async def _drain_once() -> int:
+    batch = await _claim_batch()
+    if not batch:
+        return 0
+    # split the batch across pooled connections and send the chunks concurrently
+    chunks = [batch[i::len(_pool)] for i in range(len(_pool))]
+    pairs = [(conn, chunk) for conn, chunk in zip(_pool, chunks) if chunk]
+    outcomes = await asyncio.gather(*(asyncio.to_thread(_send_chunk, conn, chunk) for conn, chunk in pairs))
+    for (_, chunk), errors in zip(pairs, outcomes):
+        for doc, error in zip(chunk, errors):
+            await _finish(doc, error)
+    return len(batch)
+
+
+async def _run():
+    while True:
+        try:
+            sent = await _drain_once()
+        except Exception as e:
+            print(f"[WARN] Outbox sender error: {e}")
+            sent = 0
+        if sent == OUTBOX_BATCH_SIZE:
+            continue  # more waiting, keep draining
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+async def start():
+    """Start the background sender"""
+    global _wake, _task
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_run())
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _task = None
+    for conn in _pool:
+        await asyncio.to_thread(conn.close)
+
+
+def stats() -> dict:
+    return {**_stats, "pool_size": len(_pool), "batch_size": OUTBOX_BATCH_SIZE}
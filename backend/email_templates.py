@@ -0,0 +1,195 @@
+# email_templates.py  (email templates compiled once, rendered by substitution)
+#
+# Each template is turned into a list of ready-to-send MIME fragments at
+# import time: the Subject is RFC 2047-encoded, both bodies are
+# quoted-printable encoded and the multipart scaffolding is laid out. Rendering
+# a message is then a join of those fragments with the recipient, date,
+# message id and OTP dropped into their slots.
+import os, time, quopri, secrets
+from email.header import Header
+from email.utils import formatdate
+from typing import Dict, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SENDER_EMAIL = os.getenv("SENDER_EMAIL") or "no-reply@krishi.ai"
+DEFAULT_LANGUAGE = "en"
+PLACEHOLDER = "{otp}"
+CRLF = "\r\n"
+
+# {otp} must sit alone on its own line so quoted-printable soft line breaks
+# never straddle the substitution point
+OTP_TEMPLATES = {
+    "en": {
+        "subject": "Krishi AI - Password Reset OTP",
+        "text": """Krishi AI - Password Reset
+
+You requested to reset your password. Use the OTP below to continue:
+
+{otp}
+
+This OTP will expire in 10 minutes.
+If you didn't request this, please ignore this email.
+
+© 2024 Krishi AI. All rights reserved.
+""",
+        "html": """<html>
+    <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f5f5f5;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+            <h2 style="color: #2d5016; margin-bottom: 20px;">Krishi AI - Password Reset</h2>
+            <p style="color: #333; font-size: 16px; line-height: 1.6;">
+                You requested to reset your password. Use the OTP below to continue:
+            </p>
+            <div style="background-color: #f0f0f0; padding: 20px; text-align: center; border-radius: 5px; margin: 20px 0;">
+                <h1 style="color: #2d5016; font-size: 36px; letter-spacing: 8px; margin: 0;">
+{otp}
+                </h1>
+            </div>
+            <p style="color: #666; font-size: 14px; line-height: 1.6;">
+                This OTP will expire in 10 minutes.<br>
+                If you didn't request this, please ignore this email.
+            </p>
+            <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
+            <p style="color: #999; font-size: 12px; text-align: center;">
+                © 2024 Krishi AI. All rights reserved.
+            </p>
+        </div>
+    </body>
+</html>
+""",
+    },
+    "ne": {
+        "subject": "कृषि AI - पासवर्ड रिसेट OTP",
+        "text": """कृषि AI - पासवर्ड रिसेट
+
+तपाईंले आफ्नो पासवर्ड रिसेट गर्न अनुरोध गर्नुभएको छ। अगाडि बढ्न तलको OTP प्रयोग गर्नुहोस्:
+
+{otp}
+
+यो OTP १० मिनेटमा समाप्त हुनेछ।
+यदि तपाईंले यो अनुरोध गर्नुभएको होइन भने, कृपया यो इमेललाई बेवास्ता गर्नुहोस्।
+
+© 2024 कृषि AI. सर्वाधिकार सुरक्षित।
+""",
+        "html": """<html>
+    <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f5f5f5;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+            <h2 style="color: #2d5016; margin-bottom: 20px;">कृषि AI - पासवर्ड रिसेट</h2>
+            <p style="color: #333; font-size: 16px; line-height: 1.6;">
+                तपाईंले आफ्नो पासवर्ड रिसेट गर्न अनुरोध गर्नुभएको छ। अगाडि बढ्न तलको OTP प्रयोग गर्नुहोस्:
+            </p>
+            <div style="background-color: #f0f0f0; padding: 20px; text-align: center; border-radius: 5px; margin: 20px 0;">
+                <h1 style="color: #2d5016; font-size: 36px; letter-spacing: 8px; margin: 0;">
+{otp}
+                </h1>
+            </div>
+            <p style="color: #666; font-size: 14px; line-height: 1.6;">
+                यो OTP १० मिनेटमा समाप्त हुनेछ।<br>
+                यदि तपाईंले यो अनुरोध गर्नुभएको होइन भने, कृपया यो इमेललाई बेवास्ता गर्नुहोस्।
+            </p>
+            <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
+            <p style="color: #999; font-size: 12px; text-align: center;">
+                © 2024 कृषि AI. सर्वाधिकार सुरक्षित।
+            </p>
+        </div>
+    </body>
+</html>
+""",
+    },
+}
+
+# fragment slots
+TO, DATE, MESSAGE_ID, OTP = object(), object(), object(), object()
+
+
+def _qp_segments(body: str) -> List:
+    """Quoted-printable encode the static parts of a body around each {otp} line"""
+    pieces = body.split(PLACEHOLDER)
+    for before, after in zip(pieces, pieces[1:]):
+        if not before.endswith("\n") or not after.startswith("\n"):
+            raise ValueError("{otp} must be on a line of its own")
+    out = []
+    for i, piece in enumerate(pieces):
+        if i:
+            out.append(OTP)
+        encoded = quopri.encodestring(piece.encode("utf-8")).decode("ascii")
+        out.append(encoded.replace("\n", CRLF))
+    return out
+
+
+def compile_template(template: Dict[str, str]) -> List:
+    """Lay out a full multipart/alternative message as static strings and slots"""
+    boundary = "==krishi_" + secrets.token_hex(12)
+    subject = template["subject"]
+    if not subject.isascii():
+        subject = Header(subject, "utf-8").encode()
+    part_headers = (
+        "Content-Type: text/{subtype}; charset=\"utf-8\"" + CRLF
+        + "Content-Transfer-Encoding: quoted-printable" + CRLF + CRLF
+    )
+    fragments = [
+        f"Subject: {subject}{CRLF}From: {SENDER_EMAIL}{CRLF}To: ", TO,
+        f"{CRLF}Date: ", DATE,
+        f"{CRLF}Message-ID: ", MESSAGE_ID,
+        f"{CRLF}MIME-Version: 1.0{CRLF}"
+        f"Content-Type: multipart/alternative; boundary=\"{boundary}\"{CRLF}{CRLF}"
+        f"--{boundary}{CRLF}" + part_headers.format(subtype="plain"),
+        *_qp_segments(template["text"]),
+        f"{CRLF}--{boundary}{CRLF}" + part_headers.format(subtype="html"),
+        *_qp_segments(template["html"]),
+        f"{CRLF}--{boundary}--{CRLF}",
+    ]
+    # merge neighbouring static strings so rendering joins as few pieces as possible
+    merged = []
+    for fragment in fragments:
+        if isinstance(fragment, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += fragment
+        else:
+            merged.append(fragment)
+    return merged
+
+
+_DOMAIN = SENDER_EMAIL.rpartition("@")[2] or "krishi.ai"
+# compiled once at import, i.e. at application startup
+COMPILED_OTP = {lang: compile_template(template) for lang, template in OTP_TEMPLATES.items()}
+
+
+def render_otp(recipient_email: str, otp: str, lang: str = DEFAULT_LANGUAGE) -> str:
+    """Full RFC 5322 message for an OTP email, ready for sendmail()"""
+    if not recipient_email.isascii() or not otp.isascii():
+        raise ValueError("recipient and OTP must be ASCII")
+    slots = {
+        TO: recipient_email,
+        DATE: formatdate(usegmt=True),
+        MESSAGE_ID: f"<{time.time_ns()}.{secrets.token_hex(4)}@{_DOMAIN}>",
+        OTP: otp,
+    }
+    fragments = COMPILED_OTP.get(lang) or COMPILED_OTP[DEFAULT_LANGUAGE]
+    return "".join(f if isinstance(f, str) else slots[f] for f in fragments)
+
+
+# ============ BENCHMARK ============
+
+def _render_mime(recipient_email: str, otp: str, lang: str) -> str:
+    """The per-message path this module replaces: fresh f-string bodies and MIME tree"""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    template = OTP_TEMPLATES[lang]
+    message = MIMEMultipart("alternative")
+    message["Subject"] = template["subject"]
+    message["From"] = SENDER_EMAIL
+    message["To"] = recipient_email
+    message.attach(MIMEText(template["text"].replace(PLACEHOLDER, otp), "plain", "utf-8"))
+    message.attach(MIMEText(template["html"].replace(PLACEHOLDER, otp), "html", "utf-8"))
+    return message.as_string()
+
+
+if __name__ == "__main__":
+    import timeit
+    n = 5000
+    for lang in OTP_TEMPLATES:
+        mime = timeit.timeit(lambda: _render_mime("farmer@example.com", "123456", lang), number=n) / n
+        compiled = timeit.timeit(lambda: render_otp("farmer@example.com", "123456", lang), number=n) / n
+        print(f"{lang}: MIME build {mime * 1e6:8.1f} us/msg   compiled {compiled * 1e6:6.1f} us/msg   "
+              f"({mime / compiled:.0f}x)")
@@ -0,0 +1,81 @@
+# fast_json.py  (orjson-backed responses with a stdlib fallback)
+#
+# FastJSONResponse is the app's default response class. Hot endpoints build
+# plain dicts and return FastJSONResponse themselves: FastAPI then skips both
+# response_model validation and jsonable_encoder, and the response_model on
+# the route only documents the shape.
+import json
+from datetime import date, datetime
+from typing import Any
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used without it
+    orjson = None
+
+
+def _default(obj: Any):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy arrays and scalars
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+if __name__ == "__main__":
+    # before/after: FastAPI's default path (jsonable_encoder + JSONResponse)
+    # against FastJSONResponse on representative payloads
+    import timeit
+    from fastapi.encoders import jsonable_encoder
+    from disease_remedies import DISEASE_REMEDIES
+
+    labels = list(DISEASE_REMEDIES)[:3]
+    payloads = {
+        "predict": {
+            "predictions": [{"label": l, "prob": 0.9 / (i + 1), "remedy": DISEASE_REMEDIES[l]} for i, l in enumerate(labels)],
+            "low_confidence": False,
+        },
+        "soil/analyze": {
+            "recommendations": [
+                {"name": f"Crop {i}", "emoji": "🌾", "description": "Perfect pH and NPK levels", "soil_fit": 90 - i,
+                 "highly_recommended": i < 3} for i in range(6)
+            ],
+            "insights": [{"type": "ph", "title": "pH Balance", "message": "pH 6.5 is ideal for most crops"}] * 3,
+            "soil_parameters": {"ph": 6.5, "nitrogen": 60.0, "phosphorus": 45.0, "potassium": 50.0, "moisture": 55.0},
+        },
+        "admin/users": {
+            "users": [
+                {"id": str(ObjectId()), "fullname": f"Farmer {i}", "email": f"farmer{i}@example.com", "role": "farmer",
+                 "provider": "credentials", "created_at": datetime.utcnow().isoformat()} for i in range(50)
+            ],
+            "next_cursor": None,
+            "limit": 50,
+        },
+    }
+    print(f"serializer: {'orjson' if orjson else 'stdlib json (orjson not installed)'}")
+    n = 2000
+    for name, payload in payloads.items():
+        before = timeit.timeit(lambda: JSONResponse(jsonable_encoder(payload)), number=n) / n
+        after = timeit.timeit(lambda: FastJSONResponse(payload), number=n) / n
+        print(f"{name:14s} default {before * 1e6:8.1f} us   fast {after * 1e6:7.1f} us   ({before / after:.1f}x)")
@@ -0,0 +1,219 @@
+# fertilizer_plan.py  (cheapest NPK fertilizer mix per crop)
+import os, json, itertools
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from soil_analysis import CROPS_DATABASE
+
+router = APIRouter()
+
+# Default product table: grade is % N - % P2O5 - % K2O, price in NPR per kg.
+# Override with a JSON list of the same shape via FERTILIZER_PRODUCTS_FILE.
+DEFAULT_PRODUCTS = [
+    {"name": "Urea", "n": 46, "p": 0, "k": 0, "price": 14.0},
+    {"name": "DAP", "n": 18, "p": 46, "k": 0, "price": 43.0},
+    {"name": "MOP (Potash)", "n": 0, "p": 0, "k": 60, "price": 35.0},
+    {"name": "SSP", "n": 0, "p": 16, "k": 0, "price": 15.0},
+    {"name": "NPK 20:20:0", "n": 20, "p": 20, "k": 0, "price": 38.0},
+    {"name": "NPK 10:26:26", "n": 10, "p": 26, "k": 26, "price": 40.0},
+]
+PRODUCTS_FILE = os.getenv("FERTILIZER_PRODUCTS_FILE")
+# kg of nutrient per hectare needed to raise the soil reading by one unit.
+# Calibrate against the local soil lab's units.
+KG_PER_SOIL_UNIT = float(os.getenv("FERTILIZER_KG_PER_SOIL_UNIT", "1.0"))
+
+MAX_PRODUCTS = 10
+MAX_BATCH_FARMS = 50_000
+# transient bytes one vectorised chunk may allocate; the number of farms per
+# chunk follows from the basis count, which grows combinatorially with products
+CHUNK_BYTES = 32 * 1024 * 1024
+# relative singularity cutoff for a basis, see FertilizerSolver.__init__
+SINGULAR_TOL = 1e-9
+NUTRIENTS = ("nitrogen", "phosphorus", "potassium")
+
+
+class Product(BaseModel):
+    name: str
+    n: float = Field(ge=0, le=100)
+    p: float = Field(ge=0, le=100)
+    k: float = Field(ge=0, le=100)
+    price: float = Field(gt=0)
+
+
+class FertilizerPlanRequest(BaseModel):
+    crop: str
+    nitrogen: float
+    phosphorus: float
+    potassium: float
+    area_ha: float = 1.0
+
+
+class FertilizerBatchRequest(BaseModel):
+    farms: List[FertilizerPlanRequest]
+    products: Optional[List[Product]] = None
+
+
+# ============ SOLVER ============
+
+class FertilizerSolver:
+    """Batched LP: minimise price . x  s.t.  lo <= soil + A x <= hi,  x >= 0.
+
+    With three nutrients the LP is tiny, so instead of running simplex per
+    farm we enumerate every basis of the constraint matrix once (it does not
+    depend on the farm), keep the non-singular ones with their inverses, and
+    then evaluate all vertices for a whole chunk of farms with two einsums.
+    """
+
+    def __init__(self, products: Tuple[Tuple[str, float, float, float, float], ...]):
+        if not products:
+            raise ValueError("product table is empty")
+        if len(products) > MAX_PRODUCTS:
+            raise ValueError(f"at most {MAX_PRODUCTS} products are supported")
+        self.names = [p[0] for p in products]
+        self.price = np.array([p[4] for p in products], dtype=float)
+        # soil units added per kg of product
+        self.A = np.array([[p[1], p[2], p[3]] for p in products], dtype=float).T / 100 / KG_PER_SOIL_UNIT
+        n = len(products)
+        self.G = np.vstack([self.A, -self.A, np.eye(n)])
+
+        rows, invs = [], []
+        for subset in itertools.combinations(range(self.G.shape[0]), n):
+            M = self.G[list(subset)]
+            # |det| over the product of row norms (Hadamard's bound) is scale-free,
+            # so product grades and KG_PER_SOIL_UNIT don't move the cutoff
+            scale = np.prod(np.linalg.norm(M, axis=1))
+            if scale == 0 or abs(np.linalg.det(M)) < SINGULAR_TOL * scale:
+                continue
+            rows.append(subset)
+            invs.append(np.linalg.inv(M))
+        self.basis_rows = np.array(rows, dtype=int)
+        self.basis_inv = np.stack(invs)
+        # per farm: gathered rhs and x (bases x n), lhs (bases x rows) and ok (bases x rows, bool)
+        per_farm = len(rows) * (8 * (2 * n + self.G.shape[0]) + self.G.shape[0])
+        self.farm_chunk = max(1, CHUNK_BYTES // per_farm)
+
+    def solve(self, current: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+        """current/lo/hi are (farms, 3). Returns (x (farms, n), feasible (farms,))"""
+        # fertilizer can only add nutrients, so a reading already above the
+        # crop maximum just means "add none of it"
+        hi = np.maximum(hi, current)
+        n = len(self.names)
+        farms = current.shape[0]
+        h = np.hstack([lo - current, current - hi, np.zeros((farms, n))])
+
+        x_best = np.zeros((farms, n))
+        feasible = np.zeros(farms, dtype=bool)
+        chunk = self.farm_chunk
+        for start in range(0, farms, chunk):
+            hc = h[start:start + chunk]
+            x = np.einsum("kij,fkj->fki", self.basis_inv, hc[:, self.basis_rows])
+            lhs = np.einsum("rj,fkj->fkr", self.G, x)
+            ok = (lhs >= hc[:, None, :] - 1e-7).all(axis=2)
+            cost = np.where(ok, x @ self.price, np.inf)
+            best = np.argmin(cost, axis=1)
+            idx = np.arange(len(hc))
+            x_best[start:start + chunk] = np.clip(x[idx, best], 0, None)
+            feasible[start:start + chunk] = ok[idx, best]
+        return x_best, feasible
+
+
+@lru_cache(maxsize=8)
+def get_solver(products: Tuple[Tuple[str, float, float, float, float], ...]) -> FertilizerSolver:
+    return FertilizerSolver(products)
+
+
+def load_products() -> List[Dict]:
+    if PRODUCTS_FILE:
+        with open(PRODUCTS_FILE, "r") as f:
+            return json.load(f)
+    return DEFAULT_PRODUCTS
+
+
+def _product_key(products: List) -> Tuple:
+    rows = []
+    for p in products:
+        p = p.dict() if isinstance(p, BaseModel) else Product(**p).dict()
+        rows.append((p["name"], float(p["n"]), float(p["p"]), float(p["k"]), float(p["price"])))
+    return tuple(rows)
+
+
+def _find_crop(name: str) -> Dict:
+    for crop in CROPS_DATABASE:
+        if crop["name"].lower() == name.strip().lower():
+            return crop
+    raise HTTPException(status_code=404, detail=f"Unknown crop: {name}")
+
+
+def plan_farms(farms: List[FertilizerPlanRequest], products: Optional[List] = None) -> List[Dict]:
+    """Solve all farms in one vectorised pass"""
+    try:
+        solver = get_solver(_product_key(products or load_products()))
+    except ValueError as e:  # includes pydantic's ValidationError for a bad products file
+        raise HTTPException(status_code=400, detail=str(e))
+
+    crops = [_find_crop(f.crop) for f in farms]
+    current = np.array([[f.nitrogen, f.phosphorus, f.potassium] for f in farms], dtype=float)
+    lo = np.array([[c[f"{nut}_min"] for nut in NUTRIENTS] for c in crops], dtype=float)
+    hi = np.array([[c[f"{nut}_max"] for nut in NUTRIENTS] for c in crops], dtype=float)
+
+    x, feasible = solver.solve(current, lo, hi)
+    resulting = current + x @ solver.A.T
+
+    plans = []
+    for i, farm in enumerate(farms):
+        if not feasible[i]:
+            plans.append({
+                "crop": crops[i]["name"],
+                "status": "infeasible",
+                "message": "No mix of the available products reaches the optimal range without overshooting another nutrient",
+            })
+            continue
+        items = [
+            {
+                "name": solver.names[j],
+                "kg_per_ha": round(float(x[i, j]), 1),
+                "kg_total": round(float(x[i, j]) * farm.area_ha, 1),
+                "cost": round(float(x[i, j] * solver.price[j]) * farm.area_ha, 2),
+            }
+            for j in range(len(solver.names)) if x[i, j] > 1e-6
+        ]
+        plans.append({
+            "crop": crops[i]["name"],
+            "status": "optimal",
+            "products": items,
+            "total_cost": round(sum(item["cost"] for item in items), 2),
+            "resulting_soil": {nut: round(float(resulting[i, k]), 2) for k, nut in enumerate(NUTRIENTS)},
+        })
+    return plans
+
+
+# ============ ENDPOINTS ============
+
+@router.post("/fertilizer-plan")
+def fertilizer_plan(req: FertilizerPlanRequest) -> Dict:
+    """Cheapest fertilizer mix that brings NPK into the crop's optimal range"""
+    if req.area_ha <= 0:
+        raise HTTPException(status_code=400, detail="Area must be positive")
+    return plan_farms([req])[0]
+
+
+@router.post("/fertilizer-plan/batch")
+def fertilizer_plan_batch(req: FertilizerBatchRequest) -> Dict:
+    """Plan many farms at once (cooperative-level planning)"""
+    if not req.farms:
+        raise HTTPException(status_code=400, detail="No farms given")
+    if len(req.farms) > MAX_BATCH_FARMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FARMS} farms per batch")
+    if any(f.area_ha <= 0 for f in req.farms):
+        raise HTTPException(status_code=400, detail="Area must be positive")
+
+    plans = plan_farms(req.farms, req.products)
+    feasible = [p for p in plans if p["status"] == "optimal"]
+    return {
+        "plans": plans,
+        "farms": len(plans),
+        "infeasible": len(plans) - len(feasible),
+        "total_cost": round(sum(p["total_cost"] for p in feasible), 2),
+    }
@@ -0,0 +1,112 @@
+# indexes.py  (MongoDB index management, run at startup)
+from datetime import datetime
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+from database import db
+
+# (collection, keys, options)
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    # admin listing: filter by role, page on _id
+    ("users", [("role", ASCENDING), ("_id", ASCENDING)], {"name": "role_id"}),
+    # history keyset: (userId, uploadedAt, _id); also serves plain per-user lookups
+    ("images", [("userId", ASCENDING), ("uploadedAt", DESCENDING), ("_id", DESCENDING)], {"name": "user_uploaded_id"}),
+    ("otp_codes", [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    # expireAfterSeconds=0: Mongo deletes each OTP once its expires_at has passed
+    ("otp_codes", [("expires_at", ASCENDING)], {"name": "expires_ttl", "expireAfterSeconds": 0}),
+    ("revoked_tokens", [("jti", ASCENDING)], {"name": "jti_unique", "unique": True}),
+    ("revoked_tokens", [("expires_at", ASCENDING)], {"name": "expires_ttl", "expireAfterSeconds": 0}),
+    ("stats_daily", [("kind", ASCENDING), ("day", ASCENDING)], {"name": "kind_day"}),
+    ("disease_rollups", [("day", ASCENDING), ("disease", ASCENDING)], {"name": "day_disease"}),
+    ("images", [("status", ASCENDING), ("uploadedAt", ASCENDING)], {"name": "status_uploaded"}),
+    ("email_outbox", [("status", ASCENDING), ("next_attempt_at", ASCENDING)], {"name": "status_next_attempt"}),
+    ("email_outbox", [("purge_at", ASCENDING)], {"name": "purge_ttl", "expireAfterSeconds": 0}),
+    # Idempotency-Key lookups; only jobs submitted with a key carry idem_key
+    ("ai_jobs", [("idem_key", ASCENDING)],
+     {"name": "idem_key_unique", "unique": True, "partialFilterExpression": {"idem_key": {"$type": "string"}}}),
+    ("ai_jobs", [("status", ASCENDING), ("created_at", ASCENDING)], {"name": "status_created"}),
+    ("ai_jobs", [("expires_at", ASCENDING)], {"name": "expires_ttl", "expireAfterSeconds": 0}),
+    ("sensor_windows", [("probeId", ASCENDING), ("windowStart", DESCENDING)], {"name": "probe_window"}),
+]
+
+# Representative queries and the index each one must use
+QUERY_PLANS = [
+    ("users", {"email": "someone@example.com"}, None, "email_unique"),
+    ("images", {"userId": "user-id"}, [("uploadedAt", DESCENDING), ("_id", DESCENDING)], "user_uploaded_id"),
+    ("otp_codes", {"email": "someone@example.com"}, None, "email_unique"),
+    ("sensor_windows", {"probeId": "probe-1"}, [("windowStart", DESCENDING)], "probe_window"),
+]
+
+# collection -> index name -> {"status": ..., "error": ..., "checked_at": ...}
+_status: Dict[str, Dict[str, Dict]] = {}
+
+
+async def ensure_indexes() -> Dict:
+    """Create any missing indexes; failures are recorded, never raised"""
+    for collection, keys, options in INDEXES:
+        name = options["name"]
+        entry = {"keys": keys, "status": "building", "checked_at": datetime.utcnow().isoformat()}
+        _status.setdefault(collection, {})[name] = entry
+        try:
+            await db[collection].create_index(keys, **options)
+            entry["status"] = "ready"
+        except PyMongoError as e:
+            # e.g. duplicate emails already stored block the unique index
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+            print(f"[WARN] Index {collection}.{name} failed: {e}")
+    return index_status()
+
+
+def index_status() -> Dict:
+    return {collection: dict(indexes) for collection, indexes in _status.items()}
+
+
+def _index_names(plan: Dict) -> List[str]:
+    """Every index used by IXSCAN stages in a winning plan tree"""
+    names = []
+    stack = [plan]
+    while stack:
+        stage = stack.pop()
+        if stage.get("stage") == "IXSCAN":
+            names.append(stage.get("indexName"))
+        if "inputStage" in stage:
+            stack.append(stage["inputStage"])
+        stack.extend(stage.get("inputStages", []))
+        # slot-based engine nests the classic plan one level down
+        if "queryPlan" in stage:
+            stack.append(stage["queryPlan"])
+    return names
+
+
+async def check_query_plans() -> List[Dict]:
+    """Explain the hot queries and confirm each one is served by its index"""
+    results = []
+    for collection, query, sort, expected in QUERY_PLANS:
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = dict(sort)
+        try:
+            explain = await db.command("explain", command, verbosity="queryPlanner")
+            used = _index_names(explain["queryPlanner"]["winningPlan"])
+            results.append({"collection": collection, "expected": expected, "used": used, "ok": expected in used})
+        except PyMongoError as e:
+            results.append({"collection": collection, "expected": expected, "used": [], "ok": False, "error": str(e)})
+    return results
+
+
+if __name__ == "__main__":
+    import asyncio, sys
+
+    async def main():
+        status = await ensure_indexes()
+        for collection, indexes in status.items():
+            for name, entry in indexes.items():
+                print(f"{collection}.{name}: {entry['status']} {entry.get('error', '')}")
+        plans = await check_query_plans()
+        for plan in plans:
+            print(f"{'OK  ' if plan['ok'] else 'FAIL'} {plan['collection']}: expected {plan['expected']}, used {plan['used']}")
+        return all(p["ok"] for p in plans)
+
+    sys.exit(0 if asyncio.run(main()) else 1)
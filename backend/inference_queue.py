@@ -0,0 +1,150 @@
+# inference_queue.py  (deadline-aware admission for model inference)
+#
+# Inference runs on a small pool of worker threads fed by a FIFO queue.
+# Every job carries a deadline: the caller's budget from X-Request-Deadline-Ms
+# or INFERENCE_DEFAULT_BUDGET_MS. Requests are shed up front with 503 +
+# Retry-After when the estimated queue wait exceeds the SLO or would blow the
+# deadline, and jobs whose deadline passed (or whose client went away) while
+# queued are dropped instead of run.
+import os, math, time, queue, asyncio, threading
+from typing import Callable, Optional
+from fastapi import HTTPException, Request
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SLO_MS = float(os.getenv("INFERENCE_QUEUE_SLO_MS", "2000"))
+INFERENCE_DEFAULT_BUDGET_MS = float(os.getenv("INFERENCE_DEFAULT_BUDGET_MS", "10000"))
+INFERENCE_MAX_BUDGET_MS = float(os.getenv("INFERENCE_MAX_BUDGET_MS", "60000"))
+# service time assumed until the first jobs have been measured
+INFERENCE_INITIAL_ESTIMATE_MS = float(os.getenv("INFERENCE_INITIAL_ESTIMATE_MS", "250"))
+EWMA_ALPHA = 0.2
+
+DEADLINE_HEADER = "x-request-deadline-ms"
+
+_queue: "queue.Queue" = queue.Queue()
+_lock = threading.Lock()
+_workers = []
+_pending = 0  # queued + running
+_service_seconds = INFERENCE_INITIAL_ESTIMATE_MS / 1000
+_stats = {"served": 0, "shed_admission": 0, "shed_expired": 0, "abandoned": 0, "failed": 0}
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def deadline_from(request: Request) -> float:
+    """Absolute monotonic deadline for this request"""
+    budget_ms = INFERENCE_DEFAULT_BUDGET_MS
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            budget_ms = min(max(float(header), 1.0), INFERENCE_MAX_BUDGET_MS)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid {DEADLINE_HEADER} header")
+    return time.monotonic() + budget_ms / 1000
+
+
+def estimated_wait() -> float:
+    """Seconds a job submitted now would wait before a worker picks it up"""
+    with _lock:
+        pending = _pending
+    return math.ceil(pending / max(1, INFERENCE_WORKERS)) * _service_seconds
+
+
+def _shed(retry_after: float, detail: str):
+    raise HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _settle(future: asyncio.Future, result=None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _worker():
+    global _pending, _service_seconds
+    while True:
+        fn, args, deadline, future, loop = _queue.get()
+        try:
+            if future.cancelled():
+                # client disconnected while queued
+                with _lock:
+                    _stats["abandoned"] += 1
+                continue
+            if time.monotonic() >= deadline:
+                with _lock:
+                    _stats["shed_expired"] += 1
+                loop.call_soon_threadsafe(_settle, future, None, DeadlineExceeded())
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = fn(*args)
+            except Exception as e:
+                with _lock:
+                    _stats["failed"] += 1
+                loop.call_soon_threadsafe(_settle, future, None, e)
+                continue
+            elapsed = time.perf_counter() - started
+            with _lock:
+                _stats["served"] += 1
+                _service_seconds += EWMA_ALPHA * (elapsed - _service_seconds)
+            loop.call_soon_threadsafe(_settle, future, result)
+        finally:
+            with _lock:
+                _pending -= 1
+
+
+def _ensure_workers():
+    if _workers:
+        return
+    with _lock:
+        if _workers:
+            return
+        for i in range(max(1, INFERENCE_WORKERS)):
+            thread = threading.Thread(target=_worker, name=f"inference-{i}", daemon=True)
+            thread.start()
+            _workers.append(thread)
+
+
+async def submit(fn: Callable, *args, deadline: float):
+    """Run fn(*args) on the inference workers before `deadline`, or raise 503"""
+    global _pending
+    _ensure_workers()
+
+    wait = estimated_wait()
+    remaining = deadline - time.monotonic()
+    if wait * 1000 > INFERENCE_QUEUE_SLO_MS or wait + _service_seconds > remaining:
+        with _lock:
+            _stats["shed_admission"] += 1
+        _shed(wait, "Inference is overloaded, please retry")
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    with _lock:
+        _pending += 1
+    _queue.put((fn, args, deadline, future, loop))
+    try:
+        return await future
+    except DeadlineExceeded:
+        _shed(estimated_wait(), "Request deadline passed while queued, please retry")
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            **_stats,
+            "pending": _pending,
+            "workers": max(1, INFERENCE_WORKERS),
+            "service_ms_ewma": round(_service_seconds * 1000, 2),
+            "estimated_wait_ms": round(math.ceil(_pending / max(1, INFERENCE_WORKERS)) * _service_seconds * 1000, 2),
+            "slo_ms": INFERENCE_QUEUE_SLO_MS,
+            "default_budget_ms": INFERENCE_DEFAULT_BUDGET_MS,
+        }
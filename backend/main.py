@@ -1,32 +1,104 @@
+import os, asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from auth import router as auth_router
-from upload import router as upload_router
-from password_reset import router as password_reset_router
-from soil_analysis import router as soil_router
-from ai_predict import router as ai_router
-from admin import router as admin_router
-
-app = FastAPI() 
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
-def home():
-    return {"message": "Krishi AI Backend Running "}
-
-# Include all routers
-app.include_router(auth_router, prefix="/auth")
-app.include_router(upload_router, prefix="/image")
-app.include_router(password_reset_router, prefix="/auth")
-app.include_router(soil_router, prefix="/soil")
-app.include_router(ai_router)  
-app.include_router(admin_router, prefix="/admin")
+import database
+import rate_limit
+from fast_json import FastJSONResponse
+from response_compression import CompressionMiddleware
+
+# "all" serves everything; "api" leaves out the AI routers (no torch in the
+# process); "inference" serves only the AI routers. Routers are imported
+# inside create_app so a role only pays for the modules it serves.
+APP_ROLES = ("all", "api", "inference")
+APP_ROLE = os.getenv("APP_ROLE", "all")
+# load the model (and run one dummy batch) during startup instead of on the first request
+APP_WARMUP = os.getenv("APP_WARMUP", "false").lower() in ("1", "true", "yes")
+
+
+def create_app(role: str = APP_ROLE, warmup: bool = APP_WARMUP) -> FastAPI:
+    if role not in APP_ROLES:
+        raise ValueError(f"unknown APP_ROLE {role!r}, expected one of {APP_ROLES}")
+    serves_api = role in ("all", "api")
+    serves_inference = role in ("all", "inference")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await database.connect()
+        if serves_api:
+            from indexes import ensure_indexes
+            from admin_stats import ensure_counters
+            from remedy_catalogue import record_version
+            import email_outbox
+            await ensure_indexes()
+            await ensure_counters()
+            await record_version()
+            await email_outbox.start()
+        if serves_inference:
+            import ai_jobs
+            if warmup:
+                import ai_predict
+                await asyncio.to_thread(ai_predict.warmup)
+            await ai_jobs.start()
+        yield
+        if serves_inference:
+            await ai_jobs.stop()
+        if serves_api:
+            from sensor_ingest import shutdown as sensor_shutdown
+            await email_outbox.stop()
+            # flush any open sensor windows before the client goes away
+            await sensor_shutdown()
+        await rate_limit.close()
+        database.close()
+
+    app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/")
+    def home():
+        return {"message": "Krishi AI Backend Running ", "role": role}
+
+    # Include all routers
+    if serves_api:
+        from auth import router as auth_router
+        from upload import router as upload_router
+        from password_reset import router as password_reset_router
+        from soil_analysis import router as soil_router
+        from soil_map import router as soil_map_router
+        from fertilizer_plan import router as fertilizer_router
+        from admin import router as admin_router
+        from outbreak_analytics import router as analytics_router
+        from sensor_ingest import router as sensor_router
+        from remedy_catalogue import router as remedy_catalogue_router
+
+        app.include_router(auth_router, prefix="/auth")
+        app.include_router(upload_router, prefix="/image")
+        app.include_router(password_reset_router, prefix="/auth")
+        app.include_router(soil_router, prefix="/soil")
+        app.include_router(soil_map_router, prefix="/soil")
+        app.include_router(fertilizer_router, prefix="/soil")
+        app.include_router(admin_router, prefix="/admin")
+        app.include_router(sensor_router, prefix="/sensors")
+        app.include_router(analytics_router)
+        app.include_router(remedy_catalogue_router)
+    if serves_inference:
+        from ai_predict import router as ai_router
+        from ai_jobs import router as ai_jobs_router
+
+        app.include_router(ai_router)
+        app.include_router(ai_jobs_router)
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,154 @@
+# outbreak_analytics.py  (disease rollups over prediction history)
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from fastapi import APIRouter, Query
+from database import db, read_db
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+MAX_DAYS = 365
+UNKNOWN_REGION = "unknown"
+MAX_REGION_LENGTH = 40
+# optional comma-separated district list; any other region is counted as unknown
+KNOWN_REGIONS = {r.strip().title() for r in os.getenv("KNOWN_REGIONS", "").split(",") if r.strip()}
+
+
+def _day(when: datetime) -> str:
+    return when.strftime("%Y-%m-%d")
+
+
+def _since(days: int) -> str:
+    return _day(datetime.utcnow() - timedelta(days=days - 1))
+
+
+def normalize_region(region: Optional[str]) -> str:
+    """Client-supplied region -> counter key: "  kathmandu " and "Kathmandu" count together"""
+    region = " ".join((region or "").split()).title()
+    if not region or len(region) > MAX_REGION_LENGTH or "|" in region or not region.isprintable():
+        return UNKNOWN_REGION
+    if KNOWN_REGIONS and region not in KNOWN_REGIONS:
+        return UNKNOWN_REGION
+    return region
+
+
+# ============ ROLLUP MAINTENANCE ============
+
+async def record_prediction(disease: str, region: Optional[str], confidence: float, when: datetime):
+    """Fold one stored prediction into its (day, region, disease) bucket"""
+    day = _day(when)
+    region = normalize_region(region)
+    try:
+        await db.disease_rollups.update_one(
+            {"_id": f"{day}|{region}|{disease}"},
+            {
+                "$set": {"day": day, "region": region, "disease": disease},
+                "$inc": {"count": 1, "confidence_sum": confidence},
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"[WARN] Disease rollup not updated: {e}")
+
+
+async def rebuild_rollups(days: int) -> Dict:
+    """Recompute the last `days` buckets from db.images (backfill / repair).
+
+    Whole days are deleted and regrouped server-side, so running it while
+    predictions keep arriving can at worst drop increments from the second
+    the pipeline runs; re-run for that day if exactness matters.
+    """
+    since_day = _since(days)
+    since = datetime.strptime(since_day, "%Y-%m-%d")
+    await db.disease_rollups.delete_many({"day": {"$gte": since_day}})
+    pipeline = [
+        {"$match": {"status": "analysed", "uploadedAt": {"$gte": since}}},
+        {"$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$uploadedAt"}},
+                "region": {"$ifNull": ["$region", UNKNOWN_REGION]},
+                "disease": "$disease",
+            },
+            "count": {"$sum": 1},
+            "confidence_sum": {"$sum": "$confidence"},
+        }},
+        {"$project": {
+            "_id": {"$concat": ["$_id.day", "|", "$_id.region", "|", "$_id.disease"]},
+            "day": "$_id.day",
+            "region": "$_id.region",
+            "disease": "$_id.disease",
+            "count": 1,
+            "confidence_sum": 1,
+        }},
+        {"$merge": {"into": "disease_rollups", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+    await db.images.aggregate(pipeline).to_list(length=None)
+    buckets = await db.disease_rollups.count_documents({"day": {"$gte": since_day}})
+    return {"since": since_day, "buckets": buckets}
+
+
+# ============ QUERIES ============
+
+@router.get("/outbreaks/trends")
+async def outbreak_trends(
+    disease: Optional[str] = None,
+    region: Optional[str] = None,
+    days: int = Query(30, ge=1, le=MAX_DAYS),
+):
+    """Daily diagnosis counts, optionally for one disease and/or region"""
+    match = {"day": {"$gte": _since(days)}}
+    if disease:
+        match["disease"] = disease
+    if region:
+        match["region"] = region
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$day", "count": {"$sum": "$count"}, "confidence_sum": {"$sum": "$confidence_sum"}}},
+        {"$sort": {"_id": 1}},
+    ]
+    series = []
+    async for row in read_db.disease_rollups.aggregate(pipeline):
+        series.append({
+            "day": row["_id"],
+            "count": row["count"],
+            "avg_confidence": round(row["confidence_sum"] / row["count"], 2) if row["count"] else 0.0,
+        })
+    return {"disease": disease, "region": region, "days": days, "series": series}
+
+
+@router.get("/outbreaks/hotspots")
+async def outbreak_hotspots(
+    days: int = Query(7, ge=1, le=MAX_DAYS // 2),
+    limit: int = Query(10, ge=1, le=100),
+    include_healthy: bool = False,
+):
+    """(region, disease) pairs with the most cases in the last `days`, with growth vs the window before"""
+    recent_since = _since(days)
+    previous_since = _since(days * 2)
+
+    match = {"day": {"$gte": previous_since}}
+    if not include_healthy:
+        match["disease"] = {"$not": {"$regex": "healthy$"}}
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"region": "$region", "disease": "$disease"},
+            "recent": {"$sum": {"$cond": [{"$gte": ["$day", recent_since]}, "$count", 0]}},
+            "previous": {"$sum": {"$cond": [{"$lt": ["$day", recent_since]}, "$count", 0]}},
+        }},
+        {"$match": {"recent": {"$gt": 0}}},
+        {"$sort": {"recent": -1}},
+        {"$limit": limit},
+    ]
+    hotspots = []
+    async for row in read_db.disease_rollups.aggregate(pipeline):
+        hotspots.append({
+            "region": row["_id"]["region"],
+            "disease": row["_id"]["disease"],
+            "cases": row["recent"],
+            "previous_cases": row["previous"],
+            "growth": round(row["recent"] / row["previous"], 2) if row["previous"] else None,
+        })
+    return {"days": days, "hotspots": hotspots}
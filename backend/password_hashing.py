@@ -0,0 +1,231 @@
+# password_hashing.py  (argon2 hashing on a bounded worker pool)
+import os, time, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Argon2 parameters (memory cost is in KiB)
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+# Peak hashing memory is roughly HASH_WORKERS * ARGON2_MEMORY_COST
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# queued + running operations before new ones are turned away with 503
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+ph = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
+
+# argon2-cffi releases the GIL, so plain threads give real parallelism
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="argon2")
+_lock = threading.Lock()
+_pending = 0
+_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "running": 0,
+    "max_pending": 0,
+    "queue_wait_seconds": 0.0,
+    "run_seconds": 0.0,
+}
+
+
+async def _run(fn, *args):
+    """Run fn on the hashing pool, refusing work past HASH_MAX_PENDING"""
+    global _pending
+    if _pending >= HASH_MAX_PENDING:
+        with _lock:
+            _metrics["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+    _pending += 1
+    enqueued = time.perf_counter()
+    with _lock:
+        _metrics["submitted"] += 1
+        _metrics["max_pending"] = max(_metrics["max_pending"], _pending)
+
+    def job():
+        started = time.perf_counter()
+        with _lock:
+            _metrics["running"] += 1
+            _metrics["queue_wait_seconds"] += started - enqueued
+        try:
+            return fn(*args)
+        finally:
+            with _lock:
+                _metrics["running"] -= 1
+                _metrics["completed"] += 1
+                _metrics["run_seconds"] += time.perf_counter() - started
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, job)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run(ph.hash, password)
+
+
+def _verify(hashed: str, password: str) -> bool:
+    try:
+        return ph.verify(hashed, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+async def verify_password(hashed: Optional[str], password: str) -> bool:
+    """True if password matches hashed (OAuth users without a password never match)"""
+    if not hashed:
+        return False
+    return await _run(_verify, hashed, password)
+
+
+def needs_rehash(hashed: Optional[str]) -> bool:
+    """True if hashed was made with parameters other than the current ones"""
+    if not hashed:
+        return False
+    try:
+        return ph.check_needs_rehash(hashed)
+    except InvalidHashError:
+        return False
+
+
+def stats() -> dict:
+    """Pool configuration and queueing metrics"""
+    with _lock:
+        snapshot = dict(_metrics)
+    done = snapshot["completed"] or 1
+    return {
+        "workers": HASH_WORKERS,
+        "max_pending": HASH_MAX_PENDING,
+        "pending": _pending,
+        "queued": max(0, _pending - snapshot["running"]),
+        **snapshot,
+        "avg_queue_wait_ms": round(snapshot["queue_wait_seconds"] / done * 1000, 2),
+        "avg_run_ms": round(snapshot["run_seconds"] / done * 1000, 2),
+        "params": {
+            "time_cost": ARGON2_TIME_COST,
+            "memory_cost_kib": ARGON2_MEMORY_COST,
+            "parallelism": ARGON2_PARALLELISM,
+        },
+    }
+
+
+# ============ BENCHMARK ============
+
+async def _bench(concurrency: int, total: int, pooled: bool):
+    """Simulate a login burst; report throughput and worst event-loop stall"""
+    hashed = ph.hash("benchmark-password")
+    max_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not stop.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - before - 0.005)
+
+    remaining = total
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            if pooled:
+                await verify_password(hashed, "benchmark-password")
+            else:
+                ph.verify(hashed, "benchmark-password")
+            await asyncio.sleep(0)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    label = "pooled" if pooled else "inline"
+    print(f"{label:>7}: {total / elapsed:7.1f} logins/s   max loop stall {max_lag * 1000:7.1f} ms")
+
+
+# ============ CALIBRATION ============
+
+def _verify_ms(hasher: PasswordHasher, rounds: int) -> float:
+    """Median verify latency for a hasher, in milliseconds"""
+    hashed = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.verify(hashed, "calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def calibrate(target_ms: float, memory_cost: int = ARGON2_MEMORY_COST,
+              parallelism: int = ARGON2_PARALLELISM, rounds: int = 5) -> dict:
+    """Pick argon2 parameters whose verify latency is closest to target_ms on this machine.
+
+    Memory cost is kept as given unless a single pass is already too slow, in
+    which case it is halved; time cost is then raised until the target is met.
+    """
+    time_cost = 1
+    latency = _verify_ms(PasswordHasher(time_cost=1, memory_cost=memory_cost, parallelism=parallelism), rounds)
+    while latency > target_ms and memory_cost // 2 >= 8 * parallelism:
+        memory_cost //= 2
+        latency = _verify_ms(PasswordHasher(time_cost=1, memory_cost=memory_cost, parallelism=parallelism), rounds)
+
+    best = {"time_cost": 1, "latency_ms": latency}
+    while True:
+        time_cost += 1
+        latency = _verify_ms(PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism), rounds)
+        if abs(latency - target_ms) < abs(best["latency_ms"] - target_ms):
+            best = {"time_cost": time_cost, "latency_ms": latency}
+        if latency >= target_ms:
+            break
+
+    return {
+        "time_cost": best["time_cost"],
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": round(best["latency_ms"], 1),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="argon2 tooling")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bench = sub.add_parser("bench", help="login throughput under concurrency")
+    bench.add_argument("--concurrency", type=int, default=32)
+    bench.add_argument("--requests", type=int, default=200)
+
+    cal = sub.add_parser("calibrate", help="pick parameters for a target verify latency")
+    cal.add_argument("--target-ms", type=float, default=250.0)
+    cal.add_argument("--memory-kib", type=int, default=ARGON2_MEMORY_COST)
+    cal.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(f"argon2 t={ARGON2_TIME_COST} m={ARGON2_MEMORY_COST}KiB p={ARGON2_PARALLELISM}, workers={HASH_WORKERS}")
+        asyncio.run(_bench(args.concurrency, args.requests, pooled=False))
+        asyncio.run(_bench(args.concurrency, args.requests, pooled=True))
+    else:
+        params = calibrate(args.target_ms, args.memory_kib, args.parallelism)
+        print(f"# verify takes ~{params['verify_ms']} ms on this machine")
+        print(f"ARGON2_TIME_COST={params['time_cost']}")
+        print(f"ARGON2_MEMORY_COST={params['memory_cost']}")
+        print(f"ARGON2_PARALLELISM={params['parallelism']}")
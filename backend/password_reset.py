@@ -1,85 +1,23 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from database import db
 from schemas import ForgotPasswordSchema, VerifyOTPSchema, ResetPasswordSchema
-from argon2 import PasswordHasher
+from password_hashing import hash_password
 from datetime import datetime, timedelta
 import random
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from email_outbox import enqueue_otp_email
+from rate_limit import enforce as enforce_rate_limit
 
 router = APIRouter()
-ph = PasswordHasher()
-
-# Email configuration
-SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SENDER_EMAIL = os.getenv("SENDER_EMAIL")  # Your email
-SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")  # App password for Gmail
 
 def generate_otp():
     """Generate a 6-digit OTP"""
     return str(random.randint(100000, 999999))
 
-def send_otp_email(recipient_email: str, otp: str):
-    """Send OTP via email"""
-    try:
-        message = MIMEMultipart("alternative")
-        message["Subject"] = "Krishi AI - Password Reset OTP"
-        message["From"] = SENDER_EMAIL
-        message["To"] = recipient_email
-
-        # Create HTML email
-        html = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f5f5f5;">
-                <div style="max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                    <h2 style="color: #2d5016; margin-bottom: 20px;">Krishi AI - Password Reset</h2>
-                    <p style="color: #333; font-size: 16px; line-height: 1.6;">
-                        You requested to reset your password. Use the OTP below to continue:
-                    </p>
-                    <div style="background-color: #f0f0f0; padding: 20px; text-align: center; border-radius: 5px; margin: 20px 0;">
-                        <h1 style="color: #2d5016; font-size: 36px; letter-spacing: 8px; margin: 0;">
-                            {otp}
-                        </h1>
-                    </div>
-                    <p style="color: #666; font-size: 14px; line-height: 1.6;">
-                        This OTP will expire in 10 minutes.<br>
-                        If you didn't request this, please ignore this email.
-                    </p>
-                    <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
-                    <p style="color: #999; font-size: 12px; text-align: center;">
-                        © 2024 Krishi AI. All rights reserved.
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-
-        part = MIMEText(html, "html")
-        message.attach(part)
-
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, recipient_email, message.as_string())
-        
-        return True
-    except Exception as e:
-        print(f"[OTP EMAIL ERROR] {type(e).__name__}: {e}")
-        print(f"  SMTP_SERVER={SMTP_SERVER}, SMTP_PORT={SMTP_PORT}")
-        print(f"  SENDER_EMAIL={SENDER_EMAIL}")
-        print(f"  SENDER_PASSWORD={'SET' if SENDER_PASSWORD else 'MISSING'}")
-        return False
-
 @router.post("/forgot-password")
-async def forgot_password(data: ForgotPasswordSchema):
+async def forgot_password(data: ForgotPasswordSchema, request: Request):
     """Step 1: Send OTP to user's email"""
+    await enforce_rate_limit("forgot_password", request, email=data.email)
+
     # Check if user exists
     user = await db.users.find_one({"email": data.email})
     if not user:
@@ -103,11 +41,8 @@ async def forgot_password(data: ForgotPasswordSchema):
         upsert=True
     )
 
-    # Send OTP via email
-    email_sent = send_otp_email(data.email, otp)
-    
-    if not email_sent:
-        raise HTTPException(status_code=500, detail="Failed to send OTP email")
+    # Queue the OTP email; the outbox sender delivers it in the background
+    await enqueue_otp_email(data.email, otp, data.lang)
 
     return {
         "message": "OTP sent to your email",
@@ -164,7 +99,7 @@ async def reset_password(data: ResetPasswordSchema):
         raise HTTPException(status_code=400, detail="Invalid OTP")
 
     # Hash new password
-    hashed_password = ph.hash(data.new_password)
+    hashed_password = await hash_password(data.new_password)
 
     # Update user password
     result = await db.users.update_one(
@@ -0,0 +1,202 @@
+# prefork.py  (pre-forking server: one model copy shared by all workers)
+#
+#   python prefork.py --workers 4 --port 8000
+#   kill -USR1 <master pid>      # master prints the per-worker memory report
+#   python prefork.py --report <master pid>
+#
+# The master imports the app, loads the TorchScript model and the remedy
+# catalogue, moves the weights into shared memory, freezes the GC and only
+# then forks the uvicorn workers, which all accept on one listening socket.
+# Workers therefore share the weight pages instead of each loading its own
+# copy. The master never runs a forward pass: that would start torch's
+# intra-op thread pool, which does not survive fork(). Workers that exit are
+# respawned.
+#
+# CPU only: a CUDA context created in the master is unusable in forked
+# children, so the model is always loaded on the CPU here, even on a GPU host.
+# Serve GPU inference with plain uvicorn (one process per GPU) instead.
+import os, sys, gc, time, signal, socket, argparse
+from typing import Dict, List
+
+PREFORK_SHARE_WEIGHTS = os.getenv("PREFORK_SHARE_WEIGHTS", "true").lower() in ("1", "true", "yes")
+# minimum seconds between respawns of the same slot, so a crash loop can't spin
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+_workers: Dict[int, int] = {}  # pid -> slot
+_stopping = False
+
+
+# ============ MEMORY REPORT ============
+
+def smaps_rollup(pid: int) -> Dict[str, int]:
+    """Memory counters in kB from /proc/<pid>/smaps_rollup (Linux 4.14+)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def memory_report(master_pid: int, worker_pids: List[int]) -> str:
+    """Per-process RSS, PSS, USS (private pages) and shared pages, in MB"""
+    lines = [f"{'process':>16} {'RSS':>9} {'PSS':>9} {'USS':>9} {'shared':>9}"]
+    totals = {"Rss": 0, "Pss": 0, "uss": 0}
+    for label, pid in [("master", master_pid)] + [(f"worker {pid}", pid) for pid in worker_pids]:
+        try:
+            m = smaps_rollup(pid)
+        except OSError:
+            lines.append(f"{label:>16} (gone)")
+            continue
+        uss = m.get("Private_Clean", 0) + m.get("Private_Dirty", 0)
+        shared = m.get("Shared_Clean", 0) + m.get("Shared_Dirty", 0)
+        lines.append(f"{label:>16} {m.get('Rss', 0) / 1024:8.1f}M {m.get('Pss', 0) / 1024:8.1f}M "
+                     f"{uss / 1024:8.1f}M {shared / 1024:8.1f}M")
+        totals["Rss"] += m.get("Rss", 0)
+        totals["Pss"] += m.get("Pss", 0)
+        totals["uss"] += uss
+    lines.append(f"{'total':>16} {totals['Rss'] / 1024:8.1f}M {totals['Pss'] / 1024:8.1f}M {totals['uss'] / 1024:8.1f}M")
+    lines.append("PSS total is the real footprint; RSS total double-counts shared pages")
+    return "\n".join(lines)
+
+
+# ============ MASTER ============
+
+def _shared_tensors(ai_predict):
+    """Every tensor the loaded models hold: the full model, per-crop heads and crop indices"""
+    models = [ai_predict._model] + [head for head, _ in ai_predict._crop_heads.values()]
+    for model in models:
+        yield from model.parameters()
+        yield from model.buffers()
+    yield from ai_predict._crop_index.values()
+
+
+def preload(share_weights: bool = PREFORK_SHARE_WEIGHTS):
+    """Import the app and load everything workers should share"""
+    import main
+    import ai_predict
+    from disease_remedies import DISEASE_REMEDIES
+
+    if main.APP_ROLE in ("all", "inference"):
+        if ai_predict.MODEL_DEVICE == "cuda":
+            print("[WARN] MODEL_DEVICE=cuda is ignored: forked workers can't share a CUDA context, serving on CPU")
+        ai_predict.MODEL_DEVICE = "cpu"
+        try:
+            ai_predict.warmup(forward=False)
+        except (FileNotFoundError, RuntimeError) as e:
+            print(f"[WARN] Model not preloaded, workers will load their own copies: {e}")
+        if share_weights and ai_predict._model is not None:
+            # MAP_SHARED pages: stay shared even if a worker touches them
+            for tensor in _shared_tensors(ai_predict):
+                tensor.share_memory_()
+    len(DISEASE_REMEDIES)
+    # objects allocated so far are never collected, so the GC stops writing
+    # to their headers and dirtying the pages workers share with the master
+    gc.collect()
+    gc.freeze()
+    return main.app
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, torch_threads: int, log_level: str):
+    import uvicorn
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGUSR1, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    import ai_predict
+    if ai_predict.torch is not None:
+        ai_predict.torch.set_num_threads(torch_threads)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(slot: int, app, sock: socket.socket, torch_threads: int, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, torch_threads, log_level)
+        except BaseException as e:
+            print(f"[prefork] worker {os.getpid()} crashed: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+    _workers[pid] = slot
+    return pid
+
+
+def serve(host: str, port: int, workers: int, torch_threads: int, log_level: str):
+    app = preload()
+    sock = bind(host, port)
+    master_pid = os.getpid()
+    print(f"[prefork] master {master_pid} listening on {host}:{port}, {workers} workers x {torch_threads} torch threads")
+
+    def stop(signum, frame):
+        global _stopping
+        _stopping = True
+        for pid in list(_workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGUSR1, lambda signum, frame: print(memory_report(master_pid, sorted(_workers)), flush=True))
+
+    last_spawn = {}
+    for slot in range(workers):
+        _spawn(slot, app, sock, torch_threads, log_level)
+        last_spawn[slot] = time.monotonic()
+
+    while _workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = _workers.pop(pid, None)
+        if slot is None or _stopping:
+            continue
+        print(f"[prefork] worker {pid} exited ({os.waitstatus_to_exitcode(status)}), respawning")
+        wait = RESPAWN_BACKOFF_SECONDS - (time.monotonic() - last_spawn.get(slot, 0))
+        if wait > 0:
+            time.sleep(wait)
+        _spawn(slot, app, sock, torch_threads, log_level)
+        last_spawn[slot] = time.monotonic()
+    sock.close()
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Pre-forking server sharing one model copy across workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREFORK_WORKERS", str(cpus))))
+    parser.add_argument("--torch-threads", type=int, default=None,
+                        help="intra-op threads per worker (default: cpus / workers)")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--report", type=int, metavar="MASTER_PID",
+                        help="print the memory report for a running master and exit")
+    args = parser.parse_args()
+    if args.report:
+        with open(f"/proc/{args.report}/task/{args.report}/children") as f:
+            children = [int(pid) for pid in f.read().split()]
+        print(memory_report(args.report, children))
+        return
+    torch_threads = args.torch_threads or max(1, cpus // max(1, args.workers))
+    serve(args.host, args.port, max(1, args.workers), torch_threads, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# rate_limit.py  (token-bucket rate limiting for expensive endpoints)
+#
+# Every route has a list of (scope, requests, per_seconds) limits; a request
+# spends one token from the bucket of each scope it can be identified by
+# (client IP, signed-in user, target email) and is refused with 429 +
+# Retry-After when any bucket is empty. Buckets live in this process by
+# default; set RATE_LIMIT_REDIS_URL so all workers share them. Any
+# Redis-protocol server works, e.g. for local testing:
+#   redis-server --port 6379        (or: valkey-server / docker run -p 6379:6379 valkey/valkey)
+#   RATE_LIMIT_REDIS_URL=redis://localhost:6379/0
+import os, json, math, time, hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, Request
+from dotenv import load_dotenv
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional; only needed for the shared backend
+    aioredis = None
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+# use the first X-Forwarded-For hop as the client IP (only behind a trusted proxy)
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+# in-process buckets kept before the least recently used are dropped
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# route -> {scope: (requests, per_seconds)}; the bucket holds `requests`
+# tokens and refills at requests / per_seconds tokens per second
+DEFAULT_LIMITS = {
+    "forgot_password": {"ip": (5, 300), "email": (3, 600)},
+    "login": {"ip": (20, 60), "email": (10, 300)},
+    "register": {"ip": (5, 600)},
+    "predict": {"ip": (30, 60), "user": (60, 60)},
+}
+
+
+def _load_limits() -> Dict[str, Dict[str, Tuple[float, float]]]:
+    """DEFAULT_LIMITS overlaid with RATE_LIMITS, e.g. '{"login": {"ip": [50, 60]}}'"""
+    limits = {route: dict(scopes) for route, scopes in DEFAULT_LIMITS.items()}
+    override = os.getenv("RATE_LIMITS")
+    if override:
+        try:
+            for route, scopes in json.loads(override).items():
+                for scope, (requests, per_seconds) in scopes.items():
+                    limits.setdefault(route, {})[scope] = (float(requests), float(per_seconds))
+        except (ValueError, TypeError) as e:
+            print(f"[WARN] Ignoring invalid RATE_LIMITS: {e}")
+    return limits
+
+
+LIMITS = _load_limits()
+
+_stats = {"allowed": 0, "limited": 0, "backend_errors": 0}
+
+
+# ============ BACKENDS ============
+
+class MemoryBuckets:
+    """Buckets for this process only; every operation is O(1)"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._max_keys = max_keys
+
+    async def take(self, buckets: List[Tuple[str, float, float]]) -> float:
+        """Spend one token from every bucket, or none; returns 0 or seconds to wait"""
+        now = time.monotonic()
+        levels = []
+        wait = 0.0
+        for key, capacity, rate in buckets:
+            state = self._buckets.get(key)
+            tokens = capacity if state is None else min(capacity, state[0] + (now - state[1]) * rate)
+            levels.append(tokens)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+        for (key, _, _), tokens in zip(buckets, levels):
+            self._buckets[key] = [tokens if wait else tokens - 1, now]
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def close(self):
+        pass
+
+
+# All buckets of a request are checked and spent in one round trip, using the
+# server's clock so workers on different hosts agree on refill time.
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local n = #KEYS
+local levels = {}
+local wait = 0
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = capacity
+    if state[1] then
+        tokens = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * rate)
+    end
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local tokens = levels[i]
+    if wait == 0 then tokens = tokens - 1 end
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate * 1000) + 1000)
+end
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Buckets shared by every worker through a Redis-protocol server"""
+
+    def __init__(self, url: str):
+        self._client = aioredis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, buckets: List[Tuple[str, float, float]]) -> float:
+        keys = [key for key, _, _ in buckets]
+        args = [value for _, capacity, rate in buckets for value in (capacity, rate)]
+        return float(await self._take(keys=keys, args=args))
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def _make_backend():
+    if RATE_LIMIT_REDIS_URL:
+        if aioredis is None:
+            print("[WARN] RATE_LIMIT_REDIS_URL set but redis is not installed; limiting per process")
+        else:
+            return RedisBuckets(RATE_LIMIT_REDIS_URL)
+    return MemoryBuckets()
+
+
+_backend = _make_backend()
+# used when the shared backend is unreachable, so limits still apply per worker
+_fallback = _backend if isinstance(_backend, MemoryBuckets) else MemoryBuckets()
+
+
+# ============ ENFORCEMENT ============
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _key(route: str, scope: str, identity: str) -> str:
+    # hashed so emails and IPs never show up in the limiter's key space
+    digest = hashlib.blake2b(identity.encode("utf-8"), digest_size=12).hexdigest()
+    return f"rl:{route}:{scope}:{digest}"
+
+
+async def enforce(route: str, request: Request, email: Optional[str] = None, user_id: Optional[str] = None):
+    """Spend one token for each identity of this request, or raise 429 with Retry-After"""
+    if not RATE_LIMIT_ENABLED or route not in LIMITS:
+        return
+    identities = {"ip": client_ip(request), "email": email.lower() if email else None, "user": user_id}
+    buckets = [
+        (_key(route, scope, identities[scope]), requests, requests / per_seconds)
+        for scope, (requests, per_seconds) in LIMITS[route].items()
+        if identities.get(scope)
+    ]
+    if not buckets:
+        return
+
+    try:
+        wait = await _backend.take(buckets)
+    except Exception as e:
+        _stats["backend_errors"] += 1
+        print(f"[WARN] Rate limit backend error, limiting per process: {e}")
+        wait = await _fallback.take(buckets)
+
+    if wait > 0:
+        _stats["limited"] += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+    _stats["allowed"] += 1
+
+
+async def close():
+    await _backend.close()
+
+
+def stats() -> dict:
+    return {
+        **_stats,
+        "backend": type(_backend).__name__,
+        "limits": {route: {scope: list(limit) for scope, limit in scopes.items()} for route, scopes in LIMITS.items()},
+    }
@@ -0,0 +1,93 @@
+# remedy_catalogue.py  (versioned remedy catalogue for offline sync)
+#
+# Clients keep the catalogue locally and send the version they hold;
+# they get back only the entries whose content hash changed since then, plus
+# the keys that were removed. The entry hashes of every version this service
+# has run with are kept in db.remedy_catalogue_versions, recorded at startup.
+# Bodies are spliced from the compiled artifact's stored JSON, cached per
+# base version, and carry strong ETags, so the compression middleware caches
+# their compressed variants too.
+import json
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from database import db, read_db
+from disease_remedies import DISEASE_REMEDIES
+
+router = APIRouter(prefix="/api/remedies", tags=["Remedies"])
+
+# base version ("" for a full snapshot) -> response body
+_bodies: Dict[str, bytes] = {}
+
+
+def entry_hashes() -> Dict[str, str]:
+    return {key: DISEASE_REMEDIES.entry_hash(key) for key in DISEASE_REMEDIES}
+
+
+async def record_version():
+    """Store this catalogue version's entry hashes so later versions can diff against it"""
+    try:
+        await db.remedy_catalogue_versions.update_one(
+            {"_id": DISEASE_REMEDIES.version},
+            {"$setOnInsert": {"entries": entry_hashes(), "created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"[WARN] Remedy catalogue version not recorded: {e}")
+
+
+def _render(base_version: Optional[str], base_hashes: Optional[Dict[str, str]]) -> bytes:
+    """Snapshot (no base) or delta body, built from the stored entry JSON without re-encoding"""
+    current = entry_hashes()
+    if base_hashes is None:
+        changed, removed = list(current), []
+    else:
+        changed = [key for key, digest in current.items() if base_hashes.get(key) != digest]
+        removed = [key for key in base_hashes if key not in current]
+
+    entries = b",".join(
+        json.dumps(key).encode() + b':{"hash":"' + current[key].encode() + b'","remedy":' + DISEASE_REMEDIES.raw(key) + b"}"
+        for key in changed
+    )
+    head = json.dumps({
+        "version": DISEASE_REMEDIES.version,
+        "base_version": base_version,
+        "full": base_hashes is None,
+        "count": len(current),
+        "removed": removed,
+    }, separators=(",", ":"))
+    return head[:-1].encode() + b',"entries":{' + entries + b"}}"
+
+
+@router.get("/catalogue/version")
+async def catalogue_version():
+    """Current catalogue version, for a cheap "anything new?" check"""
+    return {"version": DISEASE_REMEDIES.version, "count": len(DISEASE_REMEDIES)}
+
+
+@router.get("/catalogue")
+async def catalogue(request: Request, since: Optional[str] = None):
+    """Full catalogue, or only what changed since the client's version.
+
+    An unknown or expired `since` falls back to a full snapshot (full=true),
+    which the client should apply by replacing its copy.
+    """
+    current = DISEASE_REMEDIES.version
+    base, base_hashes = None, None
+    if since == current:
+        base, base_hashes = current, entry_hashes()  # up to date: an empty delta
+    elif since:
+        doc = await read_db.remedy_catalogue_versions.find_one({"_id": since}, {"entries": 1})
+        if doc is not None:
+            base, base_hashes = since, doc["entries"]
+
+    etag = f'"{current}-{base or "full"}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=0, must-revalidate"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    body = _bodies.get(base or "")
+    if body is None:
+        body = _bodies[base or ""] = _render(base, base_hashes)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,262 @@
+# response_compression.py  (Accept-Encoding negotiation for API responses)
+#
+# Pure ASGI middleware: picks zstd, brotli or gzip from the client's
+# Accept-Encoding (zstd and brotli only when their packages are installed),
+# leaves small bodies and already-compressed content types alone, and
+# compresses streaming responses chunk by chunk. Responses that carry an
+# ETag are static for that tag, so their compressed variants are cached.
+# Each encoded variant gets its own validator ("tag" -> "tag-gzip"), as a
+# strong ETag must name one exact byte sequence; the suffix is stripped from
+# If-None-Match before the app sees it, so its 304 checks keep working.
+import os, zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# higher = smaller bodies, more CPU per response
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+
+# server preference when the client accepts several at the same q
+SUPPORTED_ENCODINGS = [e for e, available in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if available]
+
+# compressing these again only costs CPU
+SKIP_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip",
+                      "application/x-gzip", "application/zstd", "application/octet-stream", "font/woff")
+
+_stats = {"compressed": 0, "skipped_small": 0, "cache_hits": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding the client accepts, or None"""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """ETag of the encoded variant: "abc" -> "abc-gzip" (W/ prefix kept)"""
+    return etag[:-1] + f'-{encoding}"' if etag.endswith('"') else f"{etag}-{encoding}"
+
+
+def _strip_variants(if_none_match: str) -> Tuple[str, Optional[str]]:
+    """If-None-Match with encoding suffixes removed, and the encoding that was removed"""
+    tags, stripped = [], None
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        for encoding in ("zstd", "br", "gzip"):
+            suffix = f'-{encoding}"'
+            if tag.endswith(suffix):
+                tag, stripped = tag[:-len(suffix)] + '"', encoding
+                break
+        tags.append(tag)
+    return ", ".join(tags), stripped
+
+
+class _Encoder:
+    """Incremental compressor; each chunk is flushed so streamed lines reach the client"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._c = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._c = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._c = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._c.finish()
+        return self._c.flush()
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "gzip":
+        c = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        return c.compress(body) + c.flush()
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress(body)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, cache_entries: int = COMPRESSION_CACHE_ENTRIES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache_entries = cache_entries
+        # (etag, encoding) -> compressed body
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        revalidated = None
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            if_none_match, revalidated = _strip_variants(if_none_match)
+            if revalidated:
+                scope = dict(scope)
+                scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"if-none-match"]
+                scope["headers"].append((b"if-none-match", if_none_match.encode("latin-1")))
+        responder = _Responder(self, send, encoding, revalidated)
+        await self.app(scope, receive, responder.send)
+
+    def cached(self, etag: Optional[str], encoding: str, body: bytes) -> bytes:
+        if not etag:
+            return compress(encoding, body)
+        key = (etag, encoding)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            _stats["cache_hits"] += 1
+            return hit
+        compressed = compress(encoding, body)
+        self._cache[key] = compressed
+        if len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+        return compressed
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: Optional[str],
+                 revalidated: Optional[str] = None):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        # encoding of the variant whose ETag the client revalidated, if any
+        self.revalidated = revalidated
+        self.start = None
+        self.passthrough = False
+        self.encoder: Optional[_Encoder] = None
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        if self.start["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(SKIP_CONTENT_TYPES)
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            # held back until the first body chunk says how big the response is
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+        if self.encoder is not None:
+            await self._send_streamed(message)
+            return
+
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        self.start["headers"] = headers.raw
+        if self.start["status"] == 304 and self.revalidated and "etag" in headers:
+            # the client holds the encoded variant: answer with its validator
+            headers["ETag"] = variant_etag(headers["etag"], self.revalidated)
+        if not self._compressible(headers):
+            await self._pass(message)
+            return
+        vary = headers.get("vary")
+        if not vary:
+            headers["Vary"] = "Accept-Encoding"
+        elif "accept-encoding" not in vary.lower():
+            headers["Vary"] = vary + ", Accept-Encoding"
+        if self.encoding is None:
+            await self._pass(message)
+            return
+
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            # streaming response: compress each chunk as it arrives
+            self.encoder = _Encoder(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            del headers["content-length"]
+            if "etag" in headers:
+                headers["ETag"] = variant_etag(headers["etag"], self.encoding)
+            await self._send(self.start)
+            await self._send_streamed(message)
+            return
+
+        if len(body) < self.middleware.minimum_size:
+            _stats["skipped_small"] += 1
+            await self._pass(message)
+            return
+        etag = headers.get("etag")
+        compressed = self.middleware.cached(etag, self.encoding, body)
+        if len(compressed) >= len(body):
+            await self._pass(message)
+            return
+        if etag:
+            headers["ETag"] = variant_etag(etag, self.encoding)
+        _stats["compressed"] += 1
+        _stats["bytes_in"] += len(body)
+        _stats["bytes_out"] += len(compressed)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _pass(self, message):
+        self.passthrough = True
+        await self._send(self.start)
+        await self._send(message)
+
+    async def _send_streamed(self, message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        data = self.encoder.chunk(body) if body else b""
+        if not more_body:
+            data += self.encoder.finish()
+            _stats["compressed"] += 1
+        _stats["bytes_in"] += len(body)
+        _stats["bytes_out"] += len(data)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+
+def stats() -> dict:
+    return {
+        **_stats,
+        "encodings": SUPPORTED_ENCODINGS,
+        "minimum_size": COMPRESSION_MIN_SIZE,
+        "levels": {"gzip": COMPRESSION_GZIP_LEVEL, "br": COMPRESSION_BROTLI_QUALITY, "zstd": COMPRESSION_ZSTD_LEVEL},
+    }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List
 
 class RegisterSchema(BaseModel):
     fullname: str
@@ -39,6 +39,7 @@ class OAuthLoginSchema(BaseModel):
 # NEW: Password Reset Schemas
 class ForgotPasswordSchema(BaseModel):
     email: EmailStr
+    lang: str = "en"  # OTP email language: "en" or "ne"
 
 class VerifyOTPSchema(BaseModel):
     email: EmailStr
@@ -47,4 +48,40 @@ class VerifyOTPSchema(BaseModel):
 class ResetPasswordSchema(BaseModel):
     email: EmailStr
     otp: str
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+# Response models for the hot endpoints. Those endpoints return
+# FastJSONResponse directly, so these document the shape without being
+# re-validated on every response.
+class RemedyResponse(BaseModel):
+    name: str
+    name_nepali: Optional[str] = None
+    severity: Optional[str] = None
+    symptoms: List[str] = []
+    organic_treatments: List[str] = []
+    chemical_treatments: List[str] = []
+    prevention: List[str] = []
+
+class PredictionItem(BaseModel):
+    label: str
+    prob: float
+    remedy: Optional[RemedyResponse] = None
+
+class PredictResponse(BaseModel):
+    predictions: List[PredictionItem]
+    low_confidence: bool
+    rejected: Optional[bool] = None
+    message: Optional[str] = None
+
+class AdminUserResponse(BaseModel):
+    id: str
+    fullname: str
+    email: str
+    role: str
+    provider: str
+    created_at: str
+
+class AdminUserPage(BaseModel):
+    users: List[AdminUserResponse]
+    next_cursor: Optional[str] = None
+    limit: int
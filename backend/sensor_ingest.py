@@ -0,0 +1,311 @@
+# sensor_ingest.py  (streaming soil-probe ingestion)
+import os, math, time, asyncio
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from pymongo.errors import BulkWriteError
+from database import db, read_db
+from soil_analysis import CROPS_DATABASE, SoilAnalysisRequest, calculate_soil_fit
+
+router = APIRouter()
+
+# Aggregation window and pipeline limits
+WINDOW_SECONDS = int(os.getenv("SENSOR_WINDOW_SECONDS", "60"))
+WINDOW_GRACE_SECONDS = int(os.getenv("SENSOR_WINDOW_GRACE_SECONDS", "5"))
+FLUSH_INTERVAL = float(os.getenv("SENSOR_FLUSH_INTERVAL", "1.0"))
+QUEUE_MAX_BATCHES = int(os.getenv("SENSOR_QUEUE_MAX_BATCHES", "1000"))
+MAX_READINGS_PER_BATCH = int(os.getenv("SENSOR_MAX_READINGS_PER_BATCH", "5000"))
+# accepted reading timestamps: up to this old (probes that buffered offline) ...
+MAX_LATENESS_SECONDS = int(os.getenv("SENSOR_MAX_LATENESS_SECONDS", str(24 * 3600)))
+# ... and this far ahead of the server clock; anything else (e.g. milliseconds) is rejected
+MAX_CLOCK_SKEW_SECONDS = int(os.getenv("SENSOR_MAX_CLOCK_SKEW_SECONDS", "300"))
+
+FIELDS = ("ph", "moisture", "temperature", "nitrogen", "phosphorus", "potassium")
+SCORING_FIELDS = ("ph", "nitrogen", "phosphorus", "potassium", "moisture")
+
+# pipeline state (created lazily inside the running event loop)
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+# (probe_id, window_start) -> {field: [min, max, sum, count]}
+_windows: Dict[Tuple[str, int], Dict[str, list]] = {}
+# window_start of the newest window already written, per probe
+_closed_until: Dict[str, int] = {}
+_stats = {
+    "readings_accepted": 0,
+    "readings_rejected": 0,
+    "readings_late": 0,
+    "batches_rejected": 0,
+    "windows_flushed": 0,
+    "flush_errors": 0,
+}
+
+
+# ============ PARSING ============
+
+def parse_reading(raw: Dict, now: float) -> Optional[Tuple[str, float, Dict[str, float]]]:
+    """Validate one JSON reading -> (probe_id, ts, values) or None"""
+    probe_id = raw.get("probeId")
+    if not probe_id or not isinstance(probe_id, str):
+        return None
+    ts = raw.get("ts", now)
+    try:
+        ts = float(ts)
+        values = {f: float(raw[f]) for f in FIELDS if raw.get(f) is not None}
+    except (TypeError, ValueError):
+        return None
+    # the range check also rejects NaN, which fails every comparison
+    if not values or not (now - MAX_LATENESS_SECONDS <= ts <= now + MAX_CLOCK_SKEW_SECONDS):
+        return None
+    if not all(math.isfinite(v) for v in values.values()):
+        return None
+    return probe_id, ts, values
+
+
+def parse_line(line: str, now: float) -> Optional[Tuple[str, float, Dict[str, float]]]:
+    """Parse line protocol: `<probeId> ph=6.4,moisture=41.2 [unix_ts]`"""
+    parts = line.split()
+    if len(parts) not in (2, 3):
+        return None
+    raw = {"probeId": parts[0]}
+    for pair in parts[1].split(","):
+        key, _, value = pair.partition("=")
+        if key in FIELDS:
+            raw[key] = value
+    if len(parts) == 3:
+        raw["ts"] = parts[2]
+    return parse_reading(raw, now)
+
+
+# ============ AGGREGATION ============
+
+def _window_start(ts: float) -> int:
+    return int(ts // WINDOW_SECONDS) * WINDOW_SECONDS
+
+
+def _aggregate(batch: List[Tuple[str, float, Dict[str, float]]]):
+    """Fold a batch of readings into the open per-probe windows"""
+    for probe_id, ts, values in batch:
+        start = _window_start(ts)
+        if start <= _closed_until.get(probe_id, -1):
+            _stats["readings_late"] += 1
+            continue
+        window = _windows.get((probe_id, start))
+        if window is None:
+            window = _windows[(probe_id, start)] = {}
+        for field, value in values.items():
+            agg = window.get(field)
+            if agg is None:
+                window[field] = [value, value, value, 1]
+            else:
+                if value < agg[0]:
+                    agg[0] = value
+                if value > agg[1]:
+                    agg[1] = value
+                agg[2] += value
+                agg[3] += 1
+
+
+def _score_window(means: Dict[str, float]) -> Optional[List[Dict]]:
+    """Re-score a closed window against the crop table (needs pH, NPK and moisture)"""
+    if any(f not in means for f in SCORING_FIELDS):
+        return None
+    soil = SoilAnalysisRequest(**{f: means[f] for f in SCORING_FIELDS})
+    scored = [
+        {"name": crop["name"], "soil_fit": calculate_soil_fit(soil, crop)}
+        for crop in CROPS_DATABASE
+    ]
+    scored.sort(key=lambda x: x["soil_fit"], reverse=True)
+    return scored[:3]
+
+
+def _window_doc(probe_id: str, start: int, window: Dict[str, list]) -> Dict:
+    stats = {}
+    means = {}
+    for field, (lo, hi, total, count) in window.items():
+        means[field] = total / count
+        stats[field] = {"min": lo, "max": hi, "mean": round(means[field], 3), "count": count}
+    return {
+        "probeId": probe_id,
+        "windowStart": datetime.utcfromtimestamp(start),
+        "windowSeconds": WINDOW_SECONDS,
+        "stats": stats,
+        "recommendations": _score_window(means),
+        "createdAt": datetime.utcnow(),
+    }
+
+
+async def _flush(force: bool = False):
+    """Close finished windows and bulk-write them.
+
+    A window leaves _windows (and late readings for it start being dropped)
+    only once it has been written; windows whose write failed stay open and
+    are retried on the next flush.
+    """
+    cutoff = time.time() - WINDOW_SECONDS - WINDOW_GRACE_SECONDS
+    closing = [key for key in _windows if force or key[1] <= cutoff]
+    if not closing:
+        return
+
+    docs, keys = [], []
+    for probe_id, start in closing:
+        try:
+            docs.append(_window_doc(probe_id, start, _windows[(probe_id, start)]))
+            keys.append((probe_id, start))
+        except Exception as e:
+            # unwritable window: drop it rather than abort the flush or retry forever
+            del _windows[(probe_id, start)]
+            _stats["flush_errors"] += 1
+            print(f"[WARN] Dropped sensor window {probe_id}@{start}: {e}")
+    if not docs:
+        return
+
+    failed = set()
+    try:
+        await db.sensor_windows.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"] for err in e.details.get("writeErrors", [])}
+        _stats["flush_errors"] += 1
+        print(f"[WARN] Failed to write {len(failed)} of {len(docs)} sensor windows, will retry")
+    except Exception as e:
+        failed = set(range(len(docs)))
+        _stats["flush_errors"] += 1
+        print(f"[WARN] Failed to write {len(docs)} sensor windows, will retry: {e}")
+
+    for i, (probe_id, start) in enumerate(keys):
+        if i in failed:
+            continue
+        del _windows[(probe_id, start)]
+        if start > _closed_until.get(probe_id, -1):
+            _closed_until[probe_id] = start
+    _stats["windows_flushed"] += len(docs) - len(failed)
+
+
+async def _run():
+    """Single consumer: drains the ingest queue and flushes on an interval"""
+    next_flush = time.monotonic() + FLUSH_INTERVAL
+    while True:
+        timeout = max(0.0, next_flush - time.monotonic())
+        try:
+            batch = await asyncio.wait_for(_queue.get(), timeout=timeout)
+            _aggregate(batch)
+        except asyncio.TimeoutError:
+            pass
+        if time.monotonic() >= next_flush:
+            await _flush()
+            next_flush = time.monotonic() + FLUSH_INTERVAL
+
+
+def _ensure_worker():
+    global _queue, _worker
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=QUEUE_MAX_BATCHES)
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(_run())
+
+
+async def shutdown():
+    """Stop the consumer and write whatever windows are still open"""
+    global _worker
+    if _worker is not None:
+        _worker.cancel()
+        try:
+            await _worker
+        except (asyncio.CancelledError, Exception):
+            pass
+        _worker = None
+    if _queue is not None:
+        while not _queue.empty():
+            _aggregate(_queue.get_nowait())
+    await _flush(force=True)
+
+
+def _parse_batch(items: List, parser, item_type: type) -> List:
+    if len(items) > MAX_READINGS_PER_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_READINGS_PER_BATCH} readings per batch")
+    now = time.time()
+    batch = []
+    for item in items:
+        reading = parser(item, now) if isinstance(item, item_type) else None
+        if reading is None:
+            _stats["readings_rejected"] += 1
+        else:
+            batch.append(reading)
+    return batch
+
+
+# ============ ENDPOINTS ============
+
+@router.post("/readings")
+async def ingest_readings(request: Request):
+    """Ingest a newline-delimited line-protocol batch; 429 when the pipeline is saturated"""
+    _ensure_worker()
+    body = (await request.body()).decode("utf-8", errors="replace")
+    lines = [line for line in body.splitlines() if line.strip()]
+    batch = _parse_batch(lines, parse_line, str)
+
+    try:
+        _queue.put_nowait(batch)
+    except asyncio.QueueFull:
+        _stats["batches_rejected"] += 1
+        raise HTTPException(status_code=429, detail="Ingest queue full", headers={"Retry-After": "1"})
+
+    _stats["readings_accepted"] += len(batch)
+    return {"accepted": len(batch), "rejected": len(lines) - len(batch), "queued": _queue.qsize()}
+
+
+@router.websocket("/ws")
+async def ingest_ws(websocket: WebSocket):
+    """Ingest JSON batches (`[{"probeId": .., "ts": .., "ph": ..}, ...]`) over a WebSocket.
+
+    Each message is acknowledged; when the queue is full we stop reading until
+    there is room, which pushes back on the sender through TCP flow control.
+    """
+    await websocket.accept()
+    _ensure_worker()
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):  # malformed JSON, or a binary frame
+                await websocket.send_json({"error": "Expected a JSON text message"})
+                continue
+            items = message if isinstance(message, list) else [message]
+            try:
+                batch = _parse_batch(items, parse_reading, dict)
+            except HTTPException as e:
+                await websocket.send_json({"error": e.detail})
+                continue
+            await _queue.put(batch)
+            _stats["readings_accepted"] += len(batch)
+            await websocket.send_json({
+                "accepted": len(batch),
+                "rejected": len(items) - len(batch),
+                "queued": _queue.qsize(),
+            })
+    except WebSocketDisconnect:
+        pass
+
+
+@router.get("/stats")
+async def ingest_stats():
+    """Pipeline counters and current queue depth"""
+    return {
+        **_stats,
+        "open_windows": len(_windows),
+        "queued_batches": _queue.qsize() if _queue is not None else 0,
+        "queue_capacity": QUEUE_MAX_BATCHES,
+        "window_seconds": WINDOW_SECONDS,
+    }
+
+
+@router.get("/probes/{probe_id}/windows")
+async def probe_windows(probe_id: str, limit: int = 20):
+    """Most recent closed windows for a probe"""
+    limit = max(1, min(limit, 500))
+    cursor = read_db.sensor_windows.find({"probeId": probe_id}, {"_id": 0}).sort("windowStart", -1).limit(limit)
+    windows = []
+    async for doc in cursor:
+        doc["windowStart"] = doc["windowStart"].isoformat()
+        doc["createdAt"] = doc["createdAt"].isoformat()
+        windows.append(doc)
+    return {"probeId": probe_id, "windows": windows}
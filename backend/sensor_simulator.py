@@ -0,0 +1,107 @@
+"""
+Local load generator for the sensor ingestion endpoint.
+
+    python sensor_simulator.py --probes 500 --rate 2 --duration 30
+
+Each worker thread owns a slice of the simulated probes and posts
+line-protocol batches to /sensors/readings, backing off on 429.
+"""
+import argparse, random, threading, time
+import urllib.error
+import urllib.request
+
+
+def make_line(probe_id: str, base: dict) -> str:
+    values = {
+        "ph": round(base["ph"] + random.uniform(-0.1, 0.1), 2),
+        "moisture": round(base["moisture"] + random.uniform(-2, 2), 1),
+        "temperature": round(base["temperature"] + random.uniform(-0.5, 0.5), 1),
+        "nitrogen": round(base["nitrogen"] + random.uniform(-3, 3), 1),
+        "phosphorus": round(base["phosphorus"] + random.uniform(-2, 2), 1),
+        "potassium": round(base["potassium"] + random.uniform(-2, 2), 1),
+    }
+    fields = ",".join(f"{k}={v}" for k, v in values.items())
+    return f"{probe_id} {fields} {time.time():.3f}"
+
+
+def worker(url, probes, rate, duration, batch_size, results, lock):
+    bases = {
+        p: {
+            "ph": random.uniform(5.5, 7.5),
+            "moisture": random.uniform(30, 70),
+            "temperature": random.uniform(15, 30),
+            "nitrogen": random.uniform(30, 90),
+            "phosphorus": random.uniform(20, 60),
+            "potassium": random.uniform(20, 60),
+        }
+        for p in probes
+    }
+    interval = batch_size / max(rate * len(probes), 0.001)
+    deadline = time.time() + duration
+    local = {"sent": 0, "ok": 0, "throttled": 0, "errors": 0, "latencies": []}
+
+    while time.time() < deadline:
+        started = time.perf_counter()
+        lines = [make_line(p, bases[p]) for p in random.choices(probes, k=batch_size)]
+        req = urllib.request.Request(url, data="\n".join(lines).encode(), method="POST",
+                                     headers={"Content-Type": "text/plain"})
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                resp.read()
+            local["ok"] += 1
+            local["sent"] += batch_size
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                local["throttled"] += 1
+                time.sleep(float(e.headers.get("Retry-After", "1")))
+                continue
+            local["errors"] += 1
+        except Exception:
+            local["errors"] += 1
+        elapsed = time.perf_counter() - started
+        local["latencies"].append(elapsed)
+        time.sleep(max(0.0, interval - elapsed))
+
+    with lock:
+        for key in ("sent", "ok", "throttled", "errors"):
+            results[key] += local[key]
+        results["latencies"].extend(local["latencies"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate soil probes streaming readings")
+    parser.add_argument("--url", default="http://localhost:8000/sensors/readings")
+    parser.add_argument("--probes", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=1.0, help="readings per second per probe")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    probe_ids = [f"probe-{i:05d}" for i in range(args.probes)]
+    results = {"sent": 0, "ok": 0, "throttled": 0, "errors": 0, "latencies": []}
+    lock = threading.Lock()
+    threads = []
+    for t in range(args.threads):
+        probes = probe_ids[t::args.threads]
+        if not probes:
+            continue
+        th = threading.Thread(target=worker, args=(args.url, probes, args.rate, args.duration,
+                                                   args.batch_size, results, lock))
+        th.start()
+        threads.append(th)
+    for th in threads:
+        th.join()
+
+    lat = sorted(results["latencies"]) or [0.0]
+    p50 = lat[len(lat) // 2] * 1000
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000
+    print(f"readings sent:   {results['sent']} ({results['sent'] / args.duration:.0f}/s)")
+    print(f"batches ok:      {results['ok']}")
+    print(f"batches 429:     {results['throttled']}")
+    print(f"errors:          {results['errors']}")
+    print(f"batch latency:   p50={p50:.1f}ms p99={p99:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
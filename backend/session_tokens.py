@@ -0,0 +1,163 @@
+# session_tokens.py  (stateless signed session tokens)
+import os, time, json, hmac, hashlib, base64, secrets, asyncio
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import Header, HTTPException
+from dotenv import load_dotenv
+from database import db
+
+load_dotenv()
+
+# "kid:secret" pairs, comma separated. The first key signs new tokens; the
+# rest are still accepted, so keys can be rotated without logging users out.
+SESSION_SIGNING_KEYS = os.getenv("SESSION_SIGNING_KEYS", "")
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+REVOCATION_ENABLED = os.getenv("SESSION_REVOCATION", "true").lower() in ("1", "true", "yes")
+REVOCATION_SYNC_SECONDS = float(os.getenv("SESSION_REVOCATION_SYNC_SECONDS", "30"))
+
+
+def _load_keys() -> Dict[str, bytes]:
+    keys = {}
+    for entry in SESSION_SIGNING_KEYS.split(","):
+        kid, _, secret = entry.strip().partition(":")
+        if kid and secret:
+            keys[kid] = secret.encode("utf-8")
+    if not keys:
+        print("[WARN] SESSION_SIGNING_KEYS not set; using a random key (tokens die with this process)")
+        keys["ephemeral"] = secrets.token_bytes(32)
+    return keys
+
+
+_keys = _load_keys()
+_active_kid = next(iter(_keys))
+
+# revoked token ids, mirrored from db.revoked_tokens
+_revoked = set()
+# jti -> exp of tokens revoked by this process; kept until they expire, so a
+# sync snapshot read before the revocation reached the DB can't drop them
+_revoked_here: Dict[str, float] = {}
+_last_sync = 0.0
+_sync_task: Optional[asyncio.Task] = None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(kid: str, signing_input: bytes) -> bytes:
+    return hmac.new(_keys[kid], signing_input, hashlib.sha256).digest()
+
+
+def issue_token(user_id: str, role: str, ttl: int = SESSION_TOKEN_TTL) -> str:
+    """Issue an HS256 JWT for a user"""
+    now = int(time.time())
+    header = {"alg": "HS256", "typ": "JWT", "kid": _active_kid}
+    payload = {"sub": user_id, "role": role, "iat": now, "exp": now + ttl, "jti": secrets.token_urlsafe(12)}
+    signing_input = (
+        _b64encode(json.dumps(header, separators=(",", ":")).encode())
+        + "."
+        + _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    ).encode("ascii")
+    return signing_input.decode("ascii") + "." + _b64encode(_sign(_active_kid, signing_input))
+
+
+def decode_token(token: str) -> Dict:
+    """Verify signature, expiry and revocation; returns the claims or raises 401"""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        kid = header.get("kid")
+        if header.get("alg") != "HS256" or kid not in _keys:
+            raise ValueError("unknown key")
+        expected = _sign(kid, f"{header_b64}.{payload_b64}".encode("ascii"))
+        if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+            raise ValueError("bad signature")
+        claims = json.loads(_b64decode(payload_b64))
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=401, detail="Invalid session token")
+
+    if claims.get("exp", 0) < time.time():
+        raise HTTPException(status_code=401, detail="Session expired")
+    if REVOCATION_ENABLED:
+        _maybe_sync_revocations()
+        if claims.get("jti") in _revoked:
+            raise HTTPException(status_code=401, detail="Session revoked")
+    return claims
+
+
+def _bearer(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token.strip()
+
+
+# ============ DEPENDENCIES ============
+
+async def require_session(authorization: Optional[str] = Header(None)) -> Dict:
+    """Dependency: claims of a valid bearer token, else 401"""
+    token = _bearer(authorization)
+    if token is None:
+        raise HTTPException(status_code=401, detail="Missing session token", headers={"WWW-Authenticate": "Bearer"})
+    return decode_token(token)
+
+
+async def optional_session(authorization: Optional[str] = Header(None)) -> Optional[Dict]:
+    """Dependency: claims if a bearer token is sent, None for anonymous callers"""
+    token = _bearer(authorization)
+    if token is None:
+        return None
+    return decode_token(token)
+
+
+# ============ REVOCATION ============
+
+async def revoke(claims: Dict):
+    """Revoke a token until it would have expired anyway"""
+    jti = claims.get("jti")
+    if not jti:
+        return
+    _revoked.add(jti)
+    _revoked_here[jti] = float(claims.get("exp", time.time()))
+    await db.revoked_tokens.update_one(
+        {"jti": jti},
+        {"$set": {"jti": jti, "expires_at": datetime.utcfromtimestamp(claims.get("exp", time.time()))}},
+        upsert=True,
+    )
+
+
+async def _sync_revocations():
+    global _revoked
+    try:
+        fresh = set()
+        cursor = db.revoked_tokens.find({"expires_at": {"$gt": datetime.utcnow()}}, {"jti": 1, "_id": 0})
+        async for doc in cursor:
+            fresh.add(doc["jti"])
+        now = time.time()
+        for jti, exp in list(_revoked_here.items()):
+            if exp <= now:
+                del _revoked_here[jti]  # expired: rejected on exp anyway
+        _revoked = fresh | _revoked_here.keys()
+    except Exception as e:
+        print(f"[WARN] Revocation sync failed: {e}")
+
+
+def _maybe_sync_revocations():
+    """Refresh the revocation set in the background; never blocks verification"""
+    global _last_sync, _sync_task
+    now = time.monotonic()
+    if now - _last_sync < REVOCATION_SYNC_SECONDS:
+        return
+    if _sync_task is not None and not _sync_task.done():
+        return
+    _last_sync = now
+    try:
+        _sync_task = asyncio.get_running_loop().create_task(_sync_revocations())
+    except RuntimeError:
+        pass
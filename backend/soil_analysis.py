@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 import math
+from admin_stats import record_soil_report, in_background
+from fast_json import FastJSONResponse
 
 router = APIRouter()
 
@@ -11,6 +13,7 @@ class SoilAnalysisRequest(BaseModel):
     phosphorus: float  # percentage
     potassium: float  # percentage
     moisture: float  # percentage
+    region: Optional[str] = None  # district, for admin breakdowns
 
 class CropRecommendation(BaseModel):
     name: str
@@ -19,6 +22,23 @@ class CropRecommendation(BaseModel):
     soil_fit: int  # percentage
     highly_recommended: bool
 
+class SoilInsight(BaseModel):
+    type: str
+    title: str
+    message: str
+
+class SoilParameters(BaseModel):
+    ph: float
+    nitrogen: float
+    phosphorus: float
+    potassium: float
+    moisture: float
+
+class SoilAnalysisResponse(BaseModel):
+    recommendations: List[CropRecommendation]
+    insights: List[SoilInsight]
+    soil_parameters: SoilParameters
+
 # Comprehensive crop database with pH, NPK, and moisture requirements
 CROPS_DATABASE = [
     # Major crops from design
@@ -125,6 +145,15 @@ CROPS_DATABASE = [
     },
 ]
 
+# Weighted average (pH and NPK more important than moisture)
+SOIL_FIT_WEIGHTS = {
+    "ph": 0.25,
+    "n": 0.20,
+    "p": 0.20,
+    "k": 0.20,
+    "moisture": 0.15
+}
+
 def calculate_parameter_score(value: float, min_val: float, max_val: float) -> float:
     """Calculate how well a value fits within a range (0-100)"""
     if value < min_val:
@@ -177,15 +206,7 @@ def calculate_soil_fit(soil: SoilAnalysisRequest, crop: Dict) -> float:
         crop["moisture_max"]
     )
     
-    # Weighted average (pH and NPK more important than moisture)
-    weights = {
-        "ph": 0.25,
-        "n": 0.20,
-        "p": 0.20,
-        "k": 0.20,
-        "moisture": 0.15
-    }
-    
+    weights = SOIL_FIT_WEIGHTS
     total_score = (
         ph_score * weights["ph"] +
         n_score * weights["n"] +
@@ -196,8 +217,8 @@ def calculate_soil_fit(soil: SoilAnalysisRequest, crop: Dict) -> float:
     
     return round(total_score)
 
-@router.post("/analyze")
-async def analyze_soil(soil: SoilAnalysisRequest) -> Dict:
+@router.post("/analyze", response_model=SoilAnalysisResponse)
+async def analyze_soil(soil: SoilAnalysisRequest):
     """Analyze soil and return crop recommendations"""
     
     # Validate input ranges
@@ -225,6 +246,8 @@ async def analyze_soil(soil: SoilAnalysisRequest) -> Dict:
             "highly_recommended": soil_fit >= 80
         })
     
+    in_background(record_soil_report(soil.region))
+
     # Sort by soil fit (highest first)
     recommendations.sort(key=lambda x: x["soil_fit"], reverse=True)
     
@@ -304,7 +327,7 @@ async def analyze_soil(soil: SoilAnalysisRequest) -> Dict:
                 "message": "NPK levels are adequate"
             })
     
-    return {
+    return FastJSONResponse({
         "recommendations": top_recommendations,
         "insights": insights,
         "soil_parameters": {
@@ -314,4 +337,4 @@ async def analyze_soil(soil: SoilAnalysisRequest) -> Dict:
             "potassium": soil.potassium,
             "moisture": soil.moisture
         }
-    }
\ No newline at end of file
+    })
@@ -0,0 +1,247 @@
+# soil_map.py  (interpolated nutrient surfaces + field zones)
+import math
+from typing import Dict, List
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from soil_analysis import CROPS_DATABASE, SOIL_FIT_WEIGHTS
+
+router = APIRouter()
+
+# Order matters: it is the column order of every value matrix below
+LAYERS = ("ph", "nitrogen", "phosphorus", "potassium", "moisture")
+LAYER_LIMITS = {"ph": 14, "nitrogen": 100, "phosphorus": 100, "potassium": 100, "moisture": 100}
+CROP_RANGE_KEYS = (
+    ("optimal_ph_min", "optimal_ph_max"),
+    ("nitrogen_min", "nitrogen_max"),
+    ("phosphorus_min", "phosphorus_max"),
+    ("potassium_min", "potassium_max"),
+    ("moisture_min", "moisture_max"),
+)
+LAYER_WEIGHTS = np.array([
+    SOIL_FIT_WEIGHTS["ph"], SOIL_FIT_WEIGHTS["n"], SOIL_FIT_WEIGHTS["p"],
+    SOIL_FIT_WEIGHTS["k"], SOIL_FIT_WEIGHTS["moisture"],
+])
+
+MAX_RESOLUTION = 200
+# cells x samples evaluated per IDW chunk. Each float64 (cells, samples) array
+# is 8 bytes per element and up to five are alive at once (dx, dy, their
+# squares, then d2 and weights), so the peak is ~40MB per request.
+IDW_CHUNK_ELEMENTS = 1_000_000
+
+# (n_crops, 5) range tables, built once
+_CROP_MIN = np.array([[crop[lo] for lo, _ in CROP_RANGE_KEYS] for crop in CROPS_DATABASE], dtype=float)
+_CROP_MAX = np.array([[crop[hi] for _, hi in CROP_RANGE_KEYS] for crop in CROPS_DATABASE], dtype=float)
+
+
+class SoilSample(BaseModel):
+    lat: float
+    lon: float
+    ph: float
+    nitrogen: float
+    phosphorus: float
+    potassium: float
+    moisture: float
+
+
+class SoilMapRequest(BaseModel):
+    samples: List[SoilSample]
+    resolution: int = 50        # cells along the longer side of the farm
+    power: float = 2.0          # IDW distance exponent
+    format: str = "raster"      # "raster" or "geojson"
+
+
+# ============ ENGINE ============
+
+def parameter_scores(values: np.ndarray, min_val: np.ndarray, max_val: np.ndarray) -> np.ndarray:
+    """Vectorised calculate_parameter_score (broadcasts values against ranges)"""
+    below = np.clip(100 - (min_val - values) * 10, 0, 100)
+    above = np.clip(100 - (values - max_val) * 10, 0, 100)
+    center = (min_val + max_val) / 2
+    inside = np.maximum(90, 100 - np.abs(values - center) / (max_val - min_val) * 20)
+    return np.where(values < min_val, below, np.where(values > max_val, above, inside))
+
+
+def soil_fit_matrix(values: np.ndarray) -> np.ndarray:
+    """Soil fit of every point for every crop -> (n_crops, n_points), same as calculate_soil_fit"""
+    # (n_points, 1, 5) against (n_crops, 5)
+    scores = parameter_scores(values[:, None, :], _CROP_MIN[None], _CROP_MAX[None])
+    total = scores[..., 0] * LAYER_WEIGHTS[0]
+    for i in range(1, len(LAYERS)):
+        total = total + scores[..., i] * LAYER_WEIGHTS[i]
+    return np.round(total).T
+
+
+def idw_interpolate(sample_xy: np.ndarray, sample_values: np.ndarray, grid_xy: np.ndarray,
+                    power: float = 2.0) -> np.ndarray:
+    """Inverse-distance-weighted values at grid points, computed in bounded chunks"""
+    n_samples = len(sample_xy)
+    chunk = max(1, IDW_CHUNK_ELEMENTS // n_samples)
+    out = np.empty((len(grid_xy), sample_values.shape[1]))
+    half_power = power / 2
+
+    for start in range(0, len(grid_xy), chunk):
+        cells = grid_xy[start:start + chunk]
+        dx = cells[:, 0:1] - sample_xy[None, :, 0]
+        dy = cells[:, 1:2] - sample_xy[None, :, 1]
+        d2 = dx * dx + dy * dy
+        exact = d2 < 1e-12
+        d2[exact] = 1.0
+        weights = d2 ** -half_power
+        # a cell sitting on a sample takes that sample's value
+        hit_rows = exact.any(axis=1)
+        if hit_rows.any():
+            weights[hit_rows] = exact[hit_rows].astype(float)
+        out[start:start + chunk] = (weights @ sample_values) / weights.sum(axis=1, keepdims=True)
+    return out
+
+
+def build_grid(lat: np.ndarray, lon: np.ndarray, resolution: int):
+    """Regular grid over the sample bounding box, in local metres"""
+    lat0 = math.radians(float(lat.mean()))
+    m_per_deg_lat = 110_540.0
+    m_per_deg_lon = 111_320.0 * math.cos(lat0)
+
+    lat_min, lat_max = float(lat.min()), float(lat.max())
+    lon_min, lon_max = float(lon.min()), float(lon.max())
+    height = max((lat_max - lat_min) * m_per_deg_lat, 1.0)
+    width = max((lon_max - lon_min) * m_per_deg_lon, 1.0)
+    cell = max(height, width) / resolution
+    rows = max(1, math.ceil(height / cell))
+    cols = max(1, math.ceil(width / cell))
+
+    cell_lat = cell / m_per_deg_lat
+    cell_lon = cell / m_per_deg_lon
+    center_lat = lat_min + (np.arange(rows) + 0.5) * cell_lat
+    center_lon = lon_min + (np.arange(cols) + 0.5) * cell_lon
+    grid_lat, grid_lon = np.meshgrid(center_lat, center_lon, indexing="ij")
+
+    def to_xy(la, lo):
+        return np.column_stack(((lo - lon_min) * m_per_deg_lon, (la - lat_min) * m_per_deg_lat))
+
+    return {
+        "rows": rows, "cols": cols,
+        "cell_lat": cell_lat, "cell_lon": cell_lon, "cell_m": cell,
+        "bounds": {"lat_min": lat_min, "lat_max": lat_min + rows * cell_lat,
+                   "lon_min": lon_min, "lon_max": lon_min + cols * cell_lon},
+        "grid_lat": grid_lat.ravel(), "grid_lon": grid_lon.ravel(),
+        "grid_xy": to_xy(grid_lat.ravel(), grid_lon.ravel()),
+        "sample_xy": to_xy(lat, lon),
+    }
+
+
+def zone_summary(values: np.ndarray, fits: np.ndarray, best: np.ndarray) -> List[Dict]:
+    """One zone per best-fit crop: extent, mean nutrients and the zone's top crops"""
+    zones = []
+    total_cells = len(best)
+    for crop_idx in np.unique(best):
+        mask = best == crop_idx
+        zone_fits = fits[:, mask].mean(axis=1)
+        top = np.argsort(-zone_fits)[:3]
+        means = values[mask].mean(axis=0)
+        zones.append({
+            "crop": CROPS_DATABASE[crop_idx]["name"],
+            "emoji": CROPS_DATABASE[crop_idx]["emoji"],
+            "cells": int(mask.sum()),
+            "share": round(float(mask.sum()) / total_cells, 4),
+            "mean_soil": {layer: round(float(means[i]), 2) for i, layer in enumerate(LAYERS)},
+            "recommendations": [
+                {
+                    "name": CROPS_DATABASE[i]["name"],
+                    "soil_fit": int(round(float(zone_fits[i]))),
+                    "highly_recommended": bool(zone_fits[i] >= 80),
+                }
+                for i in top
+            ],
+        })
+    zones.sort(key=lambda z: z["cells"], reverse=True)
+    return zones
+
+
+def to_geojson(grid: Dict, values: np.ndarray, fits: np.ndarray, best: np.ndarray) -> Dict:
+    half_lat = grid["cell_lat"] / 2
+    half_lon = grid["cell_lon"] / 2
+    rounded = np.round(values, 2).tolist()
+    best_fit = fits[best, np.arange(len(best))].tolist()
+    names = [crop["name"] for crop in CROPS_DATABASE]
+
+    features = []
+    for i, (la, lo) in enumerate(zip(grid["grid_lat"].tolist(), grid["grid_lon"].tolist())):
+        ring = [
+            [lo - half_lon, la - half_lat], [lo + half_lon, la - half_lat],
+            [lo + half_lon, la + half_lat], [lo - half_lon, la + half_lat],
+            [lo - half_lon, la - half_lat],
+        ]
+        props = dict(zip(LAYERS, rounded[i]))
+        props["best_crop"] = names[best[i]]
+        props["soil_fit"] = int(best_fit[i])
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": props,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def to_raster(grid: Dict, values: np.ndarray, fits: np.ndarray, best: np.ndarray) -> Dict:
+    rows, cols = grid["rows"], grid["cols"]
+    return {
+        "rows": rows,
+        "cols": cols,
+        "cell_size_m": round(grid["cell_m"], 2),
+        "bounds": grid["bounds"],
+        "layers": {
+            layer: np.round(values[:, i], 2).reshape(rows, cols).tolist()
+            for i, layer in enumerate(LAYERS)
+        },
+        "crops": [crop["name"] for crop in CROPS_DATABASE],
+        "best_crop": best.reshape(rows, cols).tolist(),
+        "soil_fit": fits[best, np.arange(len(best))].astype(int).reshape(rows, cols).tolist(),
+    }
+
+
+# ============ ENDPOINT ============
+
+@router.post("/map")
+def soil_map(req: SoilMapRequest) -> Dict:
+    """Interpolate geo-tagged samples into a nutrient surface with crop zones.
+
+    Plain `def` on purpose: the NumPy work runs in FastAPI's threadpool
+    instead of on the event loop.
+    """
+    if len(req.samples) < 3:
+        raise HTTPException(status_code=400, detail="At least 3 samples are required")
+    if not (2 <= req.resolution <= MAX_RESOLUTION):
+        raise HTTPException(status_code=400, detail=f"Resolution must be between 2 and {MAX_RESOLUTION}")
+    if req.format not in ("raster", "geojson"):
+        raise HTTPException(status_code=400, detail="Format must be 'raster' or 'geojson'")
+    if not (0 < req.power <= 6):
+        raise HTTPException(status_code=400, detail="Power must be between 0 and 6")
+
+    lat = np.fromiter((s.lat for s in req.samples), dtype=float, count=len(req.samples))
+    lon = np.fromiter((s.lon for s in req.samples), dtype=float, count=len(req.samples))
+    sample_values = np.array([[getattr(s, layer) for layer in LAYERS] for s in req.samples], dtype=float)
+
+    # min/max comparisons are all False for NaN, so check finiteness first
+    if not (np.isfinite(lat).all() and np.isfinite(lon).all() and np.isfinite(sample_values).all()):
+        raise HTTPException(status_code=400, detail="Sample values and coordinates must be finite numbers")
+    if np.abs(lat).max() > 90 or np.abs(lon).max() > 180:
+        raise HTTPException(status_code=400, detail="Invalid coordinates")
+    for i, layer in enumerate(LAYERS):
+        column = sample_values[:, i]
+        if column.min() < 0 or column.max() > LAYER_LIMITS[layer]:
+            raise HTTPException(status_code=400, detail=f"{layer} must be between 0 and {LAYER_LIMITS[layer]}")
+
+    grid = build_grid(lat, lon, req.resolution)
+    values = idw_interpolate(grid["sample_xy"], sample_values, grid["grid_xy"], req.power)
+    fits = soil_fit_matrix(values)
+    best = np.argmax(fits, axis=0)
+
+    surface = to_geojson(grid, values, fits, best) if req.format == "geojson" else to_raster(grid, values, fits, best)
+
+    return {
+        "samples": len(req.samples),
+        "format": req.format,
+        "surface": surface,
+        "zones": zone_summary(values, fits, best),
+    }
@@ -0,0 +1,74 @@
+# startup_bench.py  (import cost of the app per APP_ROLE)
+#
+#   python startup_bench.py                 # all roles, 3 runs each
+#   python startup_bench.py --roles api --runs 5 --top 15
+#
+# Each run builds the app in a fresh interpreter (nothing is served and no
+# database is contacted) and reports wall time to a ready `main.app`, peak
+# RSS, whether torch got imported, and the slowest top-level imports from
+# `python -X importtime`.
+import os, sys, json, argparse, statistics, subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_PROBE = """
+import time, json, sys, resource
+t = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "torch_loaded": "torch" in sys.modules,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def run(role: str, importtime: bool = False) -> dict:
+    env = {**os.environ, "APP_ROLE": role, "APP_WARMUP": "false"}
+    args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE]
+    proc = subprocess.run(args, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"role {role} failed to start:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        result["importtime"] = proc.stderr
+    return result
+
+
+def slowest_imports(importtime: str, top: int):
+    """Top-level packages by cumulative import time (microseconds)"""
+    totals = {}
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # nesting is shown by extra indentation; only count the outermost imports
+        name = name[1:]
+        if name.startswith(" "):
+            continue
+        totals[name] = max(totals.get(name, 0), int(cumulative_us))
+    return sorted(totals.items(), key=lambda x: -x[1])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roles", nargs="+", default=["all", "api", "inference"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for role in args.roles:
+        runs = [run(role) for _ in range(args.runs)]
+        seconds = [r["seconds"] for r in runs]
+        print(f"[{role}] import main: median {statistics.median(seconds) * 1000:.0f} ms "
+              f"(min {min(seconds) * 1000:.0f}, max {max(seconds) * 1000:.0f}), "
+              f"peak RSS {max(r['max_rss_mb'] for r in runs):.0f} MB, "
+              f"{runs[0]['modules']} modules, torch loaded: {runs[0]['torch_loaded']}")
+        for name, cumulative_us in slowest_imports(run(role, importtime=True)["importtime"], args.top):
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ export default function AdminPage() {
   // Users state
   const [users, setUsers] = useState([]);
   const [usersLoading, setUsersLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [error, setError] = useState('');
 
   // Stats
@@ -48,15 +49,17 @@ export default function AdminPage() {
     'X-Admin-Key': ADMIN_SECRET_KEY
   };
 
-  // Fetch users
-  const fetchUsers = useCallback(async () => {
+  // Fetch users (first page, or the next one when a cursor is given)
+  const fetchUsers = useCallback(async (after = null) => {
     setUsersLoading(true);
     setError('');
     try {
-      const res = await fetch(`${API_URL}/admin/users`, { headers: adminHeaders });
+      const query = after ? `?after=${after}` : '';
+      const res = await fetch(`${API_URL}/admin/users${query}`, { headers: adminHeaders });
       if (!res.ok) throw new Error('Failed to fetch users');
       const data = await res.json();
-      setUsers(data.users || []);
+      setUsers((prev) => (after ? [...prev, ...(data.users || [])] : data.users || []));
+      setNextCursor(data.next_cursor || null);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -337,6 +340,13 @@ export default function AdminPage() {
                     )}
                   </tbody>
                 </table>
+                {nextCursor && (
+                  <div style={{ textAlign: 'center', padding: '16px' }}>
+                    <button className={styles.actionButton} onClick={() => fetchUsers(nextCursor)}>
+                      Load more
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
@@ -36,6 +36,7 @@ const handler = NextAuth({
             name: data.fullname,
             email: credentials.email,
             role: data.role,
+            accessToken: data.token,
           };
         } catch (err) {
           throw new Error(err.message || "Invalid credentials");
@@ -61,6 +62,7 @@ const handler = NextAuth({
       if (user) {
         token.userId = user.id;
         token.role = user.role || "farmer";
+        token.accessToken = user.accessToken;
       }
 
       // For Google OAuth — sync with backend to get/create user record
@@ -68,7 +70,10 @@ const handler = NextAuth({
         try {
           const res = await fetch(`${API_URL}/auth/oauth-login`, {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            headers: {
+              "Content-Type": "application/json",
+              "X-OAuth-Sync-Secret": process.env.OAUTH_SYNC_SECRET || "",
+            },
             body: JSON.stringify({
               email: token.email,
               fullname: token.name,
@@ -79,6 +84,7 @@ const handler = NextAuth({
           if (res.ok) {
             token.userId = data.userId;
             token.role = data.role || "farmer";
+            token.accessToken = data.token;
           }
         } catch (err) {
           console.error("[NextAuth] OAuth backend sync failed:", err);
@@ -92,6 +98,7 @@ const handler = NextAuth({
     async session({ session, token }) {
       session.user.id = token.userId;
       session.user.role = token.role;
+      session.accessToken = token.accessToken;
       return session;
     },
   },
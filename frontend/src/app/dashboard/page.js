@@ -1,10 +1,25 @@
 'use client';
 
+import { useEffect, useState } from 'react';
 import { useAuthGuard } from '@/lib/useAuthGuard';
 import styles from './dashboard.module.css';
 
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
+
 export default function DashboardPage() {
   const { session, status } = useAuthGuard();
+  const [history, setHistory] = useState([]);
+
+  // Recent diagnoses: one small request, thumbnails only
+  useEffect(() => {
+    if (!session?.accessToken) return;
+    fetch(`${API_URL}/api/ai/history?limit=5`, {
+      headers: { Authorization: `Bearer ${session.accessToken}` },
+    })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => data && setHistory(data.items || []))
+      .catch((err) => console.error('History fetch failed:', err));
+  }, [session?.accessToken]);
 
   if (status === 'loading') {
     return (
@@ -168,6 +183,29 @@ export default function DashboardPage() {
             </div>
           </div>
         </div>
+
+        {/* Recent Diagnoses */}
+        {history.length > 0 && (
+          <div className={styles.chartCard} style={{ marginTop: '24px' }}>
+            <h3 className={styles.chartTitle}>Recent Diagnoses</h3>
+            <p className={styles.chartSubtitle}>Your latest leaf scans</p>
+            <div style={{ display: 'flex', flexDirection: 'column', gap: '12px' }}>
+              {history.map((item) => (
+                <div key={item.id} style={{ display: 'flex', alignItems: 'center', gap: '12px' }}>
+                  {item.thumbnail && (
+                    <img src={item.thumbnail} alt={item.name} width="48" height="48" style={{ borderRadius: '8px', objectFit: 'cover' }} />
+                  )}
+                  <div>
+                    <strong>{item.name}</strong>
+                    <p className={styles.chartSubtitle} style={{ margin: 0 }}>
+                      {item.confidence}% confidence · {new Date(item.uploadedAt).toLocaleDateString()}
+                    </p>
+                  </div>
+                </div>
+              ))}
+            </div>
+          </div>
+        )}
       </main>
     </div>
   );
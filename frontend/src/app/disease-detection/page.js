@@ -59,7 +59,7 @@ export default function DiseaseDetectionPage() {
       formData.append('file', selectedImage);
 
       const headers = {};
-      if (session?.user?.id) headers['X-User-Id'] = session.user.id;
+      if (session?.accessToken) headers['Authorization'] = `Bearer ${session.accessToken}`;
 
       const response = await fetch(`${API_URL}/api/ai/predict`, {
         method: 'POST',